@@ -1,24 +1,24 @@
-import requests
+import os
+import sys
+
 import pandas as pd
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.fd_client import FootballDataClient
 
 def get_premier_league_matches(api_key):
     """
     Fetch Premier League matches (finished and upcoming)
     using football-data.org's official API.
     """
-    url = "https://api.football-data.org/v4/competitions/PL/matches"
-    headers = {"X-Auth-Token": "1cf4a50fc47d43c193258b0e5a013a2e"}
-
-    response = requests.get(url, headers=headers)
-    print("Response status:", response.status_code)
-
-    if response.status_code != 200:
+    try:
+        data = FootballDataClient(api_key).get("competitions/PL/matches")
+    except requests.HTTPError as e:
         print("Error: Could not fetch data.")
-        print(response.text[:300])
+        print(e.response.text[:300])
         return None
 
-    data = response.json()
-
     matches = []
     for match in data["matches"]:
         matches.append({
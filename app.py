@@ -1,25 +1,130 @@
-import sys, os, base64
+import os, base64, time
+from concurrent.futures import Future, ThreadPoolExecutor
 import streamlit as st
-import pandas as pd
-from PIL import Image
-from src.data_loader import load_team_data
-from src.predictor import load_model, predict_match, generate_insights
+from src.assets import MANIFEST_PATH, load_manifest, variant_path, variant_url
+from src.competitions import available_competitions, partition
+from src.constants import COMPETITIONS, COMPETITION_CACHE_SIZE, DEFAULT_COMPETITION, H2H_PATH
+from src.data_loader import data_version, load_team_table, load_overview_table
+from src.snapshots import current_version, data_path
+from src.store import decode_form
+from src.team_table import TeamTable
+from src import metrics
+from src.metrics import span, timed
 
 #Page Configuration
 st.set_page_config(page_title="Premier League Predictor ⚽", page_icon="⚽", layout="wide")
 
+# Cached Resources
+# Everything read from disk is shared process-wide and keyed on the file's
+# mtime, so reruns reuse it until the file is rewritten.
+def file_version(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# Per-competition tables load on first use; only the most recently used
+# COMPETITION_CACHE_SIZE competitions stay in memory
+@st.cache_resource(show_spinner=False, max_entries=COMPETITION_CACHE_SIZE)
+def cached_stats_table(competition: str, version) -> TeamTable:
+    return load_team_table(competition)
+
+@st.cache_resource(show_spinner=False, max_entries=COMPETITION_CACHE_SIZE)
+def cached_overview_table(competition: str, version) -> TeamTable:
+    return load_overview_table(competition)
+
+@st.cache_resource(show_spinner=False)
+def cached_manifest(version) -> dict | None:
+    return load_manifest() if version is not None else None
+
+@st.cache_resource(show_spinner=False)
+def cached_h2h(path: str, version):
+    from src.h2h import load_h2h
+    return load_h2h(path) if version is not None else None
+
+@st.cache_resource(show_spinner=False)
+@timed("app.read_text")
+def cached_text(path: str, version) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@st.cache_resource(show_spinner=False)
+@timed("app.encode_image")
+def cached_data_uri(path: str, version) -> str | None:
+    if version is None: return None
+    with open(path, "rb") as f:
+        b64 = base64.b64encode(f.read()).decode("utf-8")
+    ext = os.path.splitext(path)[1].lower().strip(".") or "png"
+    return f"data:image/{ext};base64,{b64}"
+
+# Model Warm-up
+# The model and matchup table load on a background thread so the page can
+# render immediately; src.predictor is imported there too, keeping it off
+# the first-paint path. Predict waits on the returned future.
+def _load_matchups(competition: str):
+    from src.predictor import get_matchup_table
+    return get_matchup_table(competition)
+
+@st.cache_resource(show_spinner=False, max_entries=COMPETITION_CACHE_SIZE)
+def model_ready(competition: str) -> Future:
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-warmup")
+    future = executor.submit(_load_matchups, competition)
+    executor.shutdown(wait=False)
+    return future
+
+# Live Reload
+# scripts/refresh_data.py publishes data as a new snapshot. Every cache above
+# is keyed on file versions inside it, so the next run serves the new data;
+# this fragment polls the pointer so idle sessions rerun on their own too,
+# keeping their widget state.
+SNAPSHOT_POLL_SECONDS = 30
+
+@st.fragment(run_every=SNAPSHOT_POLL_SECONDS)
+def snapshot_watch():
+    if current_version() != st.session_state.get("data_snapshot"):
+        st.rerun()
+
+st.session_state["data_snapshot"] = current_version()
+snapshot_watch()
+
+# Competition picker, shown only when more than one competition has data
+competitions = available_competitions() or [DEFAULT_COMPETITION]
+competition = st.session_state.get("competition", competitions[0])
+if competition not in competitions:
+    competition = competitions[0]
+model_ready(competition)
+
+# Helper Functions
+def file_to_data_uri(path: str) -> str | None:
+    return cached_data_uri(path, file_version(path))
+
+# Built Assets
+# scripts/build_assets.py writes small WebP variants plus a manifest. With
+# static serving on (.streamlit/config.toml) pages link to them by URL and
+# the browser caches them; otherwise the variant is inlined instead of the
+# original. Without a build, the original files are inlined as before.
+STATIC_SERVING = bool(st.get_option("server.enableStaticServing"))
+
+def asset_src(rel_path: str) -> str | None:
+    """URL or data URI for assets/<rel_path>."""
+    entry = (cached_manifest(file_version(MANIFEST_PATH)) or {}).get(rel_path)
+    if entry is None:
+        return file_to_data_uri(os.path.join("assets", rel_path))
+    if STATIC_SERVING:
+        return variant_url(entry)
+    return file_to_data_uri(variant_path(entry))
+
 #Background Setup
-def set_background(image_file: str):
-    abs_path = os.path.abspath(image_file)
-    if not os.path.exists(abs_path):
-        st.warning(f"⚠️ Background image not found: {abs_path}")
+@timed("app.set_background")
+def set_background(rel_path: str):
+    encoded = asset_src(rel_path)
+    if encoded is None:
+        st.warning(f"⚠️ Background image not found: {os.path.abspath(os.path.join('assets', rel_path))}")
         return
-    with open(abs_path, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode()
     css = f"""
     <style>
     .stApp {{
-        background-image: url("data:image/jpg;base64,{encoded}");
+        background-image: url("{encoded}");
         background-size: cover;
         background-position: center;
         background-attachment: fixed;
@@ -39,41 +144,22 @@ def set_background(image_file: str):
     """
     st.markdown(css, unsafe_allow_html=True)
 
-set_background("assets/background/bg-premier.jpg")
+set_background("background/bg-premier.jpg")
 
 #Loading Custom CSS
-import time
-css_version = int(time.time())
 css_path = os.path.join(os.path.dirname(__file__), "style.css")
-if os.path.exists(css_path):
-    with open(css_path, "r", encoding="utf-8") as f:
-        st.markdown(
-            f"<style id='custom-style-{css_version}'>{f.read()}</style>",
-            unsafe_allow_html=True
-        )
-
-# Helper Functions
-def file_to_data_uri(path: str) -> str | None:
-    if not os.path.exists(path): return None
-    with open(path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
-    ext = os.path.splitext(path)[1].lower().strip(".") or "png"
-    return f"data:image/{ext};base64,{b64}"
+css_version = file_version(css_path)
+if css_version is not None:
+    st.markdown(
+        f"<style id='custom-style-{css_version}'>{cached_text(css_path, css_version)}</style>",
+        unsafe_allow_html=True
+    )
 
 def team_logo_uri(team: str):
-    path = os.path.join("assets", "logos", f"{team}.png")
-    return file_to_data_uri(path)
-
-def form_to_letters(form_str: str) -> str | None:
-    """Convert '[1, 0, -1, 1]' → '🟢 ⚪ 🔴 🟢'."""
-    if pd.isna(form_str):
-        return None
-    s = str(form_str).strip()
-    if s.startswith('[') and s.endswith(']'):
-        s = s[1:-1]
-    if not s:
-        return None
+    return asset_src(f"logos/{team}.png")
 
+def form_to_letters(form) -> str | None:
+    """Convert a form row [1, 0, -1, 1] → '🟢 ⚪ 🔴 🟢'."""
     # 🔥 Emoji mapping
     mapping = {
         1: "🟢",   # Win
@@ -81,26 +167,17 @@ def form_to_letters(form_str: str) -> str | None:
         -1: "🔴"   # Loss
     }
 
-    symbols = []
-    for part in s.split(","):
-        part = part.strip()
-        try:
-            val = int(part)
-        except ValueError:
-            continue
-        symbols.append(mapping.get(val, "❓"))
-
+    symbols = [mapping.get(val, "❓") for val in decode_form(form)]
     return " ".join(symbols) if symbols else None
 
 
 def get_team_overview(team_name: str,
-                      overview_df: pd.DataFrame,
-                      stats_df: pd.DataFrame | None = None):
-    row = overview_df[overview_df["team"] == team_name]
-    if row.empty:
+                      overview: TeamTable,
+                      stats: TeamTable | None = None):
+    if team_name not in overview:
         return {}
 
-    data = row.iloc[0]
+    data = overview.row(team_name)
     info = {
         "Position": int(data["position"]),
         "Played": int(data["played"]),
@@ -112,26 +189,25 @@ def get_team_overview(team_name: str,
         "Points": int(data["points"]),
     }
 
-    # Add recent form from pl_team_stats.csv if available
-    if stats_df is not None and "form_last_5" in stats_df.columns:
-        srow = stats_df[stats_df["team"] == team_name]
-        if not srow.empty:
-            form_letters = form_to_letters(srow.iloc[0]["form_last_5"])
-            if form_letters:
-                info["Form"] = form_letters
+    # Add recent form from the team stats table if available
+    if stats is not None and "form_last_5" in stats.columns and team_name in stats:
+        form_letters = form_to_letters(stats.row(team_name)["form_last_5"])
+        if form_letters:
+            info["Form"] = form_letters
 
     return info
 
-# Load Data + Model
-df = load_team_data()
-team_overview = pd.read_csv("data/team_overview.csv")
-team_stats = pd.read_csv("data/pl_team_stats.csv")
-model, le, class_order = load_model()
-teams = sorted(df["team"].unique())
+# Load Data
+def current_data():
+    """Team stats and league table, shared across sessions until the data changes."""
+    p = partition(competition)
+    with span("app.current_data"):
+        stats = cached_stats_table(competition, data_version(p.stats))
+        team_overview = cached_overview_table(competition, data_version(p.overview))
+    return stats, team_overview
 
 # Header Section
-pl_logo_path = os.path.join("assets", "logos", "premier-league.png")
-pl_logo_uri = file_to_data_uri(pl_logo_path)
+pl_logo_uri = asset_src("logos/premier-league.png")
 if pl_logo_uri:
     st.markdown(f"""
         <div class='header'>
@@ -140,30 +216,33 @@ if pl_logo_uri:
         </div>
     """, unsafe_allow_html=True)
 
+if len(competitions) > 1:
+    st.selectbox("Competition", competitions, key="competition",
+                 format_func=lambda code: COMPETITIONS.get(code, code))
+
 # Team Selection Section
-col1, col_mid, col2 = st.columns([2, 1, 2])
+# Each panel is a fragment: changing one selectbox reruns only that panel,
+# and pressing Predict reruns only the prediction panel.
+@st.fragment
+def team_panel(label: str, key: str):
+    stats, team_overview = current_data()
+    teams = sorted(stats.index)
 
-# Home team
-with col1:
     st.markdown("<div class='column-align'>", unsafe_allow_html=True)
 
-    home_team = st.selectbox(
-        "Select home team",
-        teams,
-        key="home_team_select"
-    )
+    team = st.selectbox(label, teams, key=key)
 
     box_html = f"""
     <div class="team-box">
         <div class="diamond-container">
             <div class="diamond"></div>
-            <img src="{team_logo_uri(home_team)}" class="team-logo" alt="{home_team} logo">
+            <img src="{team_logo_uri(team)}" class="team-logo" alt="{team} logo">
         </div>
-        <h4>{home_team}</h4>
+        <h4>{team}</h4>
     """
 
-    stats = get_team_overview(home_team, team_overview, team_stats)
-    for k, v in stats.items():
+    overview = get_team_overview(team, team_overview, stats)
+    for k, v in overview.items():
         box_html += f"<p><strong>{k}:</strong> {v}</p>"
 
     box_html += "</div>"
@@ -172,41 +251,35 @@ with col1:
 
     st.markdown("</div>", unsafe_allow_html=True)
 
-# Away team
-with col2:
-    st.markdown("<div class='column-align'>", unsafe_allow_html=True)
-
-    away_team = st.selectbox(
-        "Select away team",
-        teams,
-        key="away_team_select"
-    )
-
-    box_html = f"""
-    <div class="team-box">
-        <div class="diamond-container">
-            <div class="diamond"></div>
-            <img src="{team_logo_uri(away_team)}" class="team-logo" alt="{away_team} logo">
-        </div>
-        <h4>{away_team}</h4>
-    """
-
-    stats = get_team_overview(away_team, team_overview, team_stats)
-    for k, v in stats.items():
-        box_html += f"<p><strong>{k}:</strong> {v}</p>"
-
-    box_html += "</div>"
-
-    st.markdown(box_html, unsafe_allow_html=True)
-
-    st.markdown("</div>", unsafe_allow_html=True)
+@st.fragment
+def prediction_panel():
+    home_team = st.session_state[f"home_team_select_{competition}"]
+    away_team = st.session_state[f"away_team_select_{competition}"]
 
-with col_mid:
     st.markdown("<div class='center-align'>", unsafe_allow_html=True)
     st.markdown("<p class='vs-text'>🤜 VS 🤛</p>", unsafe_allow_html=True)
     st.markdown("<h5>Match Probabilities</h5>", unsafe_allow_html=True)
     if st.button("Predict", key="predict_button", use_container_width=True):
-        probs, label, home, away = predict_match(model, le, class_order, df, home_team, away_team)
+        stats, _ = current_data()
+        ready = model_ready(competition)
+        if not ready.done():
+            with st.spinner("Loading model..."), span("app.wait_for_model"):
+                ready.exception()
+        if ready.exception() is not None:
+            # Let the next run start a fresh warm-up; the lookup below retries now
+            model_ready.clear()
+        from src.predictor import get_matchup_table, generate_insights
+        from src.prediction_log import log_prediction
+        started = time.perf_counter()
+        with span("app.predict"):
+            matchups = get_matchup_table(competition)
+            probs, label = matchups.lookup(home_team, away_team)
+        log_prediction(home_team, away_team, probs, model_version=matchups.model_version,
+                       data_version=data_version(partition(competition).stats),
+                       latency=time.perf_counter() - started, source="app", competition=competition)
+        home = stats.row(home_team)
+        away = stats.row(away_team)
+        st.markdown(f"<p class='prediction-placeholder'>{home_team} vs {away_team}</p>", unsafe_allow_html=True)
         labels = ["Home Win", "Draw", "Away Win"]
         for lbl, prob in zip(labels, probs):
             st.markdown(f"""
@@ -220,10 +293,53 @@ with col_mid:
         insights = generate_insights(home, away, home_team, away_team)
         for i in insights:
             st.markdown(f"<p>{i}</p>", unsafe_allow_html=True)
+
+        h2h_path = data_path(H2H_PATH)
+        h2h = cached_h2h(h2h_path, file_version(h2h_path))
+        record = h2h.lookup(home_team, away_team) if h2h is not None else None
+        if record and record["played"]:
+            st.markdown("<h5>Head-to-Head</h5>", unsafe_allow_html=True)
+            st.markdown(f"<p>{home_team}: {record['wins']}W {record['draws']}D {record['losses']}L "
+                        f"in {record['played']} meetings</p>", unsafe_allow_html=True)
+            for m in record["meetings"]:
+                st.markdown(f"<p>{m['date'][:10]} · {m['home_team']} {m['home_score']}–{m['away_score']} "
+                            f"{m['away_team']}</p>", unsafe_allow_html=True)
     else:
         st.markdown("<p class='prediction-placeholder'>(Press \"Predict\" to view results)</p>", unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
 
+col1, col_mid, col2 = st.columns([2, 1, 2])
+
+# Widget keys carry the competition so each league keeps its own picks
+with col1:
+    team_panel("Select home team", f"home_team_select_{competition}")
+
+with col2:
+    team_panel("Select away team", f"away_team_select_{competition}")
+
+with col_mid:
+    prediction_panel()
+
+# Admin Panel (?admin=1): recent timings from src.metrics
+def admin_panel():
+    with st.expander("⏱️ Timings", expanded=True):
+        if not metrics.enabled():
+            st.info(f"Instrumentation is off. Start the app with {metrics.METRICS_ENV}=1 to collect timings.")
+            return
+        snap = metrics.snapshot()
+        rows = [{"span": name, "count": s["count"],
+                 **{k: round(s[k] * 1000, 3) for k in ("p50", "p95", "p99", "max")}}
+                for name, s in snap["spans"].items()]
+        st.caption("Milliseconds, over the most recent samples per span")
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+        if snap["counters"]:
+            st.json(snap["counters"])
+        st.download_button("Prometheus export", metrics.prometheus_text(),
+                           file_name="footy_metrics.prom", mime="text/plain")
+
+if st.query_params.get("admin") == "1":
+    admin_panel()
+
 # Footer
 st.markdown("""
 <hr style="margin-top: 60px; border: 1px solid rgba(255,255,255,0.1);">
@@ -0,0 +1 @@
+# Benchmark suite: synthetic leagues and hot-path timings (see benchmarks/run.py)
@@ -0,0 +1,247 @@
+# benchmarks/run.py
+# Time the hot paths on synthetic data and compare against a saved baseline.
+#
+#   python -m benchmarks.run --out bench.json
+#   python -m benchmarks.run --baseline bench.json --threshold 0.25
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic
+
+FEATURE_SIZES = [20, 100, 1000]
+MATCHUP_SIZES = [20, 100, 500]
+FOREST_BATCHES = [1, 380, 3800]
+SEASON_ROUNDS = 38
+
+
+def measure(fn, repeat=5, number=1):
+    """Median wall time of one call, over `repeat` batches of `number` calls."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - started) / number)
+    return float(np.median(times))
+
+
+def measure_subprocess(code, cwd, repeat=3):
+    """Median wall time of `code` in a fresh interpreter (cold imports and caches)."""
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                             check=True, capture_output=True, text=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return float(np.median(times))
+
+
+def _timed_snippet(body):
+    return ("import time\nt = time.perf_counter()\n" + body +
+            "\nprint(time.perf_counter() - t)\n")
+
+
+def prepare_workdir(workdir):
+    """Synthetic stats table and a trained model under `workdir` (which becomes the cwd)."""
+    from scripts.build_team_stats import build_team_stats, parse_matches, parse_standings
+    from src.data_loader import save_team_stats, save_team_overview
+
+    payloads = synthetic.league(20, seed=1)
+    standings_now = parse_standings(payloads["standings_now"])
+    matches_now = parse_matches(payloads["matches_now"])
+    stats = build_team_stats(standings_now, matches_now,
+                             parse_standings(payloads["standings_prev"]),
+                             parse_matches(payloads["matches_prev"]),
+                             matches_now.iloc[:0], 2025)
+    os.chdir(workdir)
+    os.makedirs("data", exist_ok=True)
+    save_team_stats(stats)
+    overview = standings_now.assign(position=np.arange(1, len(standings_now) + 1))
+    save_team_overview(overview)
+    return stats
+
+
+def bench_training(results):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import LabelEncoder
+    from scripts.train_team_model import BASE_PARAMS, fit_linear, save_artifacts
+    from src.constants import FEATURE_COLUMNS
+    from src.data_loader import load_team_data
+    from src.matchups import build_matchups
+
+    df = load_team_data()
+    matchups = build_matchups(df)
+    le = LabelEncoder()
+    y = le.fit_transform(matchups["result"])
+    X = matchups[FEATURE_COLUMNS]
+
+    model = RandomForestClassifier(**BASE_PARAMS, n_jobs=-1)
+    results["train_fit_20_teams"] = measure(lambda: model.fit(X, y), repeat=1)
+    save_artifacts(model, le, X, fit_linear(X, y))
+
+
+def bench_model(results, workdir):
+    from src.data_loader import load_team_table
+    from src.predictor import load_model, predict_match, predict_matches
+
+    results["load_model_cold"] = measure_subprocess(_timed_snippet(
+        "from src.predictor import load_model\nload_model()"), workdir)
+    load_model()
+    results["load_model_warm"] = measure(load_model, repeat=5)
+
+    model, le, class_order = load_model()
+    table = load_team_table()
+    teams = table.teams
+    results["predict_match_single"] = measure(
+        lambda: predict_match(model, le, class_order, table, teams[0], teams[1]), repeat=5, number=20)
+
+    season = [(h, a) for h in teams for a in teams if h != a]  # 380 fixtures
+    batch = season * 10
+    seconds = measure(lambda: predict_matches(model, le, class_order, table, batch), repeat=3)
+    results["predict_matches_3800"] = seconds
+
+    linear, _, _ = load_model("linear")
+    results["predict_match_single_linear"] = measure(
+        lambda: predict_match(linear, None, class_order, table, teams[0], teams[1]), repeat=5, number=20)
+    results["predict_matches_3800_linear"] = measure(
+        lambda: predict_matches(linear, None, class_order, table, batch), repeat=3)
+
+
+def bench_forest(results):
+    """Flat forest vs the sklearn forest it was exported from, on distinct random rows."""
+    import joblib
+    import pandas as pd
+    from src.competitions import partition
+    from src.constants import FEATURE_COLUMNS
+    from src.predictor import load_model
+
+    flat, _, _ = load_model("forest")
+    forest = joblib.load(partition().model)
+    rng = np.random.default_rng(0)
+    for n in FOREST_BATCHES:
+        X = rng.normal(0, 20, (n, len(FEATURE_COLUMNS)))
+        frame = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        results[f"flat_forest_{n}_rows"] = measure(lambda: flat.predict_proba(X), repeat=3)
+        results[f"sklearn_forest_{n}_rows"] = measure(lambda: forest.predict_proba(frame), repeat=3)
+
+
+def bench_features(results):
+    from scripts.build_team_stats import build_team_stats, parse_matches, parse_standings
+
+    for n in FEATURE_SIZES:
+        payloads = synthetic.league(n, seed=n, rounds=SEASON_ROUNDS)
+        frames = {k: (parse_standings(v) if k.startswith("standings") else parse_matches(v))
+                  for k, v in payloads.items()}
+        empty = frames["matches_now"].iloc[:0]
+        results[f"build_team_stats_{n}_teams"] = measure(
+            lambda: build_team_stats(frames["standings_now"], frames["matches_now"],
+                                     frames["standings_prev"], frames["matches_prev"], empty, 2025),
+            repeat=3)
+
+
+def bench_matchups(results):
+    import pandas as pd
+    from src.matchups import build_matchups
+
+    rng = np.random.default_rng(0)
+    for n in MATCHUP_SIZES:
+        df = pd.DataFrame({
+            "team": synthetic.team_names(n),
+            "points": rng.integers(0, 100, n),
+            "goal_diff": rng.integers(-50, 50, n),
+            "form_total": rng.integers(-5, 6, n),
+            "strength_weighted_form": rng.normal(0, 20, n),
+        })
+        results[f"build_matchups_{n}_teams"] = measure(lambda: build_matchups(df), repeat=3)
+
+
+def bench_imports(results, workdir):
+    results["import_app_deps_cold"] = measure_subprocess(_timed_snippet(
+        "import streamlit, numpy, pandas, joblib\nimport src.predictor, src.data_loader"), workdir)
+
+
+def run():
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        try:
+            prepare_workdir(workdir)
+            bench_training(results)
+            bench_model(results, workdir)
+            bench_forest(results)
+            bench_features(results)
+            bench_matchups(results)
+            bench_imports(results, workdir)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """(name, baseline, current) for benchmarks slower than baseline by more than `threshold`."""
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the FootyPredictions benchmarks")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown vs baseline as a fraction (default 0.25)")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "unit": "seconds",
+        },
+        "results": run(),
+    }
+    for name, seconds in report["results"].items():
+        print(f"{name:32s} {seconds * 1000:10.3f} ms")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        for name, before, after in regressions:
+            print(f"❌ {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
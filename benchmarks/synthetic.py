@@ -0,0 +1,96 @@
+# benchmarks/synthetic.py
+# Offline synthetic leagues in the same shape as the football-data.org payloads
+
+import numpy as np
+import pandas as pd
+
+
+def team_names(n):
+    return [f"Synthetic {i:04d} FC" for i in range(n)]
+
+
+def season_matches(teams, rounds=None, seed=0, start="2025-08-16", played_fraction=1.0):
+    """Matches payload: `rounds` rounds of random pairings, one per week.
+
+    Every team plays once per round (odd team counts leave one team idle).
+    Scores are Poisson draws around a hidden per-team strength; rounds after
+    `played_fraction` of the season are left unplayed.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(teams)
+    rounds = rounds if rounds is not None else 2 * (n - 1)
+    strength = rng.normal(0, 0.35, n)
+    kickoff = pd.Timestamp(start, tz="UTC")
+
+    home_ids, away_ids, round_ids = [], [], []
+    for r in range(rounds):
+        order = rng.permutation(n)[: n - n % 2].reshape(-1, 2)
+        home_ids.append(order[:, 0])
+        away_ids.append(order[:, 1])
+        round_ids.append(np.full(len(order), r))
+    home = np.concatenate(home_ids)
+    away = np.concatenate(away_ids)
+    rnd = np.concatenate(round_ids)
+
+    home_goals = rng.poisson(np.exp(0.3 + strength[home] - strength[away]))
+    away_goals = rng.poisson(np.exp(0.1 + strength[away] - strength[home]))
+    played = rnd < int(round(rounds * played_fraction))
+    dates = kickoff + pd.to_timedelta(rnd * 7, unit="D") + pd.to_timedelta(rng.integers(0, 3, len(rnd)) * 2, unit="h")
+
+    matches = []
+    for i in range(len(rnd)):
+        matches.append({
+            "id": int(i + 1),
+            "utcDate": dates[i].strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "status": "FINISHED" if played[i] else "TIMED",
+            "homeTeam": {"name": teams[home[i]]},
+            "awayTeam": {"name": teams[away[i]]},
+            "score": {"fullTime": {
+                "home": int(home_goals[i]) if played[i] else None,
+                "away": int(away_goals[i]) if played[i] else None,
+            }},
+        })
+    return {"matches": matches}
+
+
+def standings_from_matches(payload):
+    """Standings payload (TOTAL table) computed from a matches payload."""
+    table = {}
+    for m in payload["matches"]:
+        hs, as_ = m["score"]["fullTime"]["home"], m["score"]["fullTime"]["away"]
+        for side, gf, ga in (("homeTeam", hs, as_), ("awayTeam", as_, hs)):
+            row = table.setdefault(m[side]["name"], {
+                "team": {"name": m[side]["name"]}, "playedGames": 0, "won": 0, "draw": 0,
+                "lost": 0, "points": 0, "goalsFor": 0, "goalsAgainst": 0, "goalDifference": 0,
+            })
+            if gf is None:
+                continue
+            row["playedGames"] += 1
+            row["goalsFor"] += gf
+            row["goalsAgainst"] += ga
+            row["goalDifference"] = row["goalsFor"] - row["goalsAgainst"]
+            key = "won" if gf > ga else ("draw" if gf == ga else "lost")
+            row[key] += 1
+            row["points"] += {"won": 3, "draw": 1, "lost": 0}[key]
+
+    rows = sorted(table.values(), key=lambda r: (-r["points"], -r["goalDifference"], r["team"]["name"]))
+    for position, row in enumerate(rows, start=1):
+        row["position"] = position
+    return {"standings": [{"type": "TOTAL", "table": rows}]}
+
+
+def league(n_teams, seed=0, rounds=None, played_fraction=0.6):
+    """Current + previous season payloads for one synthetic league.
+
+    Returns a dict with `standings_now`, `matches_now`, `standings_prev`
+    and `matches_prev`, each shaped like the corresponding API response.
+    """
+    teams = team_names(n_teams)
+    matches_now = season_matches(teams, rounds, seed, "2025-08-16", played_fraction)
+    matches_prev = season_matches(teams, rounds, seed + 1, "2024-08-17", 1.0)
+    return {
+        "standings_now": standings_from_matches(matches_now),
+        "matches_now": matches_now,
+        "standings_prev": standings_from_matches(matches_prev),
+        "matches_prev": matches_prev,
+    }
@@ -0,0 +1,19 @@
+# scripts/build_assets.py
+# Build resized, content-hashed WebP variants of assets/ for the app (see src/assets.py)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.assets import ASSET_DIR, BUILD_DIR, MANIFEST_PATH, build_assets
+
+
+if __name__ == "__main__":
+    manifest = build_assets(ASSET_DIR, BUILD_DIR)
+    before = sum(a["source_bytes"] for a in manifest["assets"].values())
+    after = sum(a["bytes"] for a in manifest["assets"].values())
+    for rel, a in manifest["assets"].items():
+        print(f"  {rel:<40} {a['source_bytes'] / 1024:6.1f} KB → {a['bytes'] / 1024:5.1f} KB "
+              f"({a['width']}×{a['height']})")
+    print(f"✅ Built {len(manifest['assets'])} assets into {BUILD_DIR}: "
+          f"{before / 1024:.0f} KB → {after / 1024:.0f} KB ({MANIFEST_PATH})")
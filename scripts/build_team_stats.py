@@ -1,26 +1,44 @@
-import requests
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timezone
+import argparse
+import json
 import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.fd_client import FootballDataClient, api_key
+from src.competitions import competition_code, partition
+from src.constants import DEFAULT_COMPETITION, H2H_PATH, LOWER_DIVISION
+from src.features import SPLIT_COLUMNS, IncrementalStats, home_away_splits, recent_form
+from src import metrics
+from src.metrics import dump_jsonl, span, timed
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def client() -> FootballDataClient:
+    """Shared API client, created on first use so importing this module does no I/O."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FootballDataClient(api_key())
+        return _client
 
-API_KEY = os.getenv("FOOTBALL_DATA_API_KEY")
-HEADERS = {"X-Auth-Token": API_KEY}
 
 PL = "PL"
 ELC = "ELC"
 
-def fd_get(url, params=None):
-    r = requests.get(url, headers=HEADERS, params=params)
-    r.raise_for_status()
-    return r.json()
+# Finished seasons don't change; serve them from the response cache for a day
+PREV_SEASON_MAX_AGE = 24 * 3600
 
 def season_start():
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     return now.year if now.month >= 7 else now.year - 1
 
-def pull_standings(comp, season):
-    res = fd_get(f"https://api.football-data.org/v4/competitions/{comp}/standings",
-                 {"season": season})
+def parse_standings(res):
     for s in res["standings"]:
         if s["type"] == "TOTAL":
             return pd.DataFrame([{
@@ -35,12 +53,11 @@ def pull_standings(comp, season):
                 "points": e["points"]
             } for e in s["table"]])
 
-def pull_matches(comp, season):
-    res = fd_get(f"https://api.football-data.org/v4/competitions/{comp}/matches",
-                 {"season": season})
+def parse_matches(res):
     rows = []
     for m in res["matches"]:
         rows.append({
+            "id": m["id"],
             "utcDate": pd.to_datetime(m["utcDate"]),
             "homeTeam": m["homeTeam"]["name"],
             "awayTeam": m["awayTeam"]["name"],
@@ -49,104 +66,221 @@ def pull_matches(comp, season):
         })
     return pd.DataFrame(rows)
 
-def result_value(home, away, hs, as_, team):
-    if hs is None or as_ is None:
-        return None
-    if team == home:
-        return 1 if hs > as_ else (0 if hs == as_ else -1)
-    else:
-        return 1 if as_ > hs else (0 if as_ == hs else -1)
+# (path, params) of each football-data.org request; scripts/refresh_data.py fetches these once
+def standings_request(comp, season):
+    return f"competitions/{comp}/standings", {"season": season}
 
-def home_away(df, team):
-    home = df[(df["homeTeam"] == team) & df["homeScore"].notna()]
-    away = df[(df["awayTeam"] == team) & df["awayScore"].notna()]
+def matches_request(comp, season, date_from=None, date_to=None):
+    params = {"season": season}
+    if date_from is not None:
+        params.update({"dateFrom": date_from, "dateTo": date_to})
+    return f"competitions/{comp}/matches", params
 
-    hw = sum(home["homeScore"] > home["awayScore"])
-    hd = sum(home["homeScore"] == home["awayScore"])
-    hl = sum(home["homeScore"] < home["awayScore"])
+def pull_standings(comp, season, max_age=None):
+    with span(f"build.pull_standings.{comp}"):
+        return parse_standings(client().get(*standings_request(comp, season), max_age=max_age))
 
-    aw = sum(away["awayScore"] > away["homeScore"])
-    ad = sum(away["awayScore"] == away["homeScore"])
-    al = sum(away["awayScore"] < away["homeScore"])
+def pull_matches(comp, season, date_from=None, date_to=None, max_age=None):
+    with span(f"build.pull_matches.{comp}"):
+        return parse_matches(client().get(*matches_request(comp, season, date_from, date_to), max_age=max_age))
 
-    return hw, hd, hl, aw, ad, al
+def tag(df, competition, season):
+    return df.assign(competition=competition, season=season)
 
-def last5_weighted(df_matches, team, team_stats):
-    recent = df_matches[
-        ((df_matches["homeTeam"] == team) | (df_matches["awayTeam"] == team)) &
-         df_matches["homeScore"].notna() &
-         df_matches["awayScore"].notna()
-    ].sort_values("utcDate").tail(5)
 
-    form_vec = []
-    total_form = 0
-    total_weighted = 0
+@timed("build.season_features")
+def season_features(standings_now, pl_matches_now, standings_prev,
+                    pl_matches_prev, elc_matches_prev, season, ratings=None, competition=PL):
+    """Current splits, previous-season splits and recent form, indexed by team.
 
-    for _, m in recent.iterrows():
-        r = result_value(m.homeTeam, m.awayTeam, m.homeScore, m.awayScore, team)
-        if r is None:
-            continue
+    All match frames go through the feature engine in a single pass, keyed
+    by (competition, season). `elc_matches_prev` is the division below
+    `competition` (None when there isn't one); promoted teams' previous
+    season comes from it. Form is strength-weighted with Elo `ratings` when
+    given, else with the current standings.
+    """
+    prev = season - 1
+    lower = LOWER_DIVISION.get(competition)
+    frames = [tag(pl_matches_now, competition, season), tag(pl_matches_prev, competition, prev)]
+    if lower is not None and elc_matches_prev is not None:
+        frames.append(tag(elc_matches_prev, lower, prev))
+    matches = pd.concat(frames, ignore_index=True)
+    with span("build.home_away_splits"):
+        splits = home_away_splits(matches)
+    with span("build.recent_form"):
+        form = recent_form(matches, tag(standings_now, competition, season), ratings=ratings)
 
-        opponent = m.awayTeam if m.homeTeam == team else m.homeTeam
-        opp_stats = team_stats[team_stats["team"] == opponent].iloc[0]
+    teams = sorted(set(standings_now["team"]))
+    teams_prev = set(standings_prev["team"])
 
-        opp_rating = 0.5 * opp_stats["points"] + 0.5 * opp_stats["goal_diff"]
-        if m["homeTeam"] == opponent:  # opponent was home → tougher
-            opp_rating += 5
+    def at(frame, keys):
+        idx = pd.MultiIndex.from_tuples(keys, names=["competition", "season", "team"])
+        return frame.reindex(idx).set_axis(teams)
 
-        form_vec.append(r)
-        total_form += r
-        total_weighted += r * opp_rating
+    now_keys = [(competition, season, t) for t in teams]
+    prev_keys = [(competition, prev, t) if t in teams_prev else (lower, prev, t) for t in teams]
 
-    return form_vec, total_form, total_weighted
+    now = at(splits, now_keys).fillna(0).astype(np.int64)
+    before = at(splits, prev_keys).fillna(0).astype(np.int64)
+    return now, before, at(form, now_keys)
 
 
-if __name__ == "__main__":
-    SEASON = season_start()
-    PREV = SEASON - 1
+@timed("build.assemble")
+def assemble(standings_now, now, before, recent):
+    """Build pl_team_stats rows for every team in the current standings."""
+    teams = sorted(set(standings_now["team"]))
+    now = now.reindex(teams).fillna(0).astype(np.int64)
+    before = before.reindex(teams).fillna(0).astype(np.int64)
+    recent = recent.reindex(teams)
 
-    standings_now = pull_standings(PL, SEASON)
-    pl_matches_now = pull_matches(PL, SEASON)
+    out = standings_now.drop_duplicates("team").set_index("team").loc[teams].reset_index()
+    for col in SPLIT_COLUMNS:
+        out[col] = now[col].to_numpy()
+    for col in SPLIT_COLUMNS:
+        out[f"weighted_{col}"] = now[col].to_numpy() + 0.5 * before[col].to_numpy()
+    # Teams without a finished match get an empty form vector
+    out["form_last_5"] = pd.Series([f if isinstance(f, list) else [] for f in recent["form_last_5"]],
+                                   dtype=object).to_numpy()
+    out["form_total"] = recent["form_total"].fillna(0).to_numpy().astype(np.int64)
+    out["strength_weighted_form"] = recent["strength_weighted_form"].fillna(0.0).to_numpy().astype(float)
+    return out
 
-    standings_prev = pull_standings(PL, PREV)
-    pl_matches_prev = pull_matches(PL, PREV)
-    elc_matches_prev = pull_matches(ELC, PREV)
 
-    teams_now = set(standings_now["team"])
-    teams_prev = set(standings_prev["team"])
+def build_team_stats(standings_now, pl_matches_now, standings_prev,
+                     pl_matches_prev, elc_matches_prev, season):
+    return assemble(standings_now, *season_features(
+        standings_now, pl_matches_now, standings_prev,
+        pl_matches_prev, elc_matches_prev, season))
 
-    rows = []
 
-    print("Building team strength dataset...")
-
-    for team in sorted(teams_now):
-        base = standings_now[standings_now["team"] == team].iloc[0].to_dict()
-
-        hw, hd, hl, aw, ad, al = home_away(pl_matches_now, team)
-        form_vec, form_total, weighted_form = last5_weighted(pl_matches_now, team, standings_now)
-
-        src = pl_matches_prev if team in teams_prev else elc_matches_prev
-        phw, phd, phl, paw, pad, pal = home_away(src, team)
-
-        row = {
-            "team": team,
-            **base,
-            "home_wins": hw, "home_draws": hd, "home_losses": hl,
-            "away_wins": aw, "away_draws": ad, "away_losses": al,
-            "weighted_home_wins": hw + 0.5*phw,
-            "weighted_home_draws": hd + 0.5*phd,
-            "weighted_home_losses": hl + 0.5*phl,
-            "weighted_away_wins": aw + 0.5*paw,
-            "weighted_away_draws": ad + 0.5*pad,
-            "weighted_away_losses": al + 0.5*pal,
-            "form_last_5": str(form_vec),
-            "form_total": form_total,
-            "strength_weighted_form": weighted_form
-        }
-
-        rows.append(row)
-
-    out = pd.DataFrame(rows)
-    out.to_csv("data/pl_team_stats.csv", index=False)
-    print("✅ pl_team_stats.csv generated successfully!")
+@timed("build.full_refresh")
+def full_refresh(season, h2h=None, ratings=None, elo_form=False, competition=PL):
+    """Pull both seasons and rebuild everything; also returns a fresh state.
+
+    Every pulled match is also folded into `h2h` and `ratings` when given;
+    `elo_form` weights recent form by the ratings instead of the standings.
+    """
+    prev = season - 1
+    old = PREV_SEASON_MAX_AGE
+    lower = LOWER_DIVISION.get(competition)
+    pulled = client().gather(
+        lambda: pull_standings(competition, season),
+        lambda: pull_matches(competition, season),
+        lambda: pull_standings(competition, prev, max_age=old),
+        lambda: pull_matches(competition, prev, max_age=old),
+        lambda: pull_matches(lower, prev, max_age=old) if lower else None,
+    )
+    return rebuild(season, *pulled, h2h=h2h, ratings=ratings, elo_form=elo_form, competition=competition)
+
+
+def rebuild(season, standings_now, pl_matches_now, standings_prev, pl_matches_prev, elc_matches_prev,
+            h2h=None, ratings=None, elo_form=False, competition=PL):
+    """full_refresh on already-pulled frames (`elc_matches_prev` may be None)."""
+    prev = season - 1
+    lower = LOWER_DIVISION.get(competition)
+    pulled = [(pl_matches_prev, competition, prev), (elc_matches_prev, lower, prev),
+              (pl_matches_now, competition, season)]
+    pulled = [(m, comp, s) for m, comp, s in pulled if m is not None]
+
+    if ratings is not None:
+        with span("build.ratings"):
+            ratings.fold(pd.concat([tag(m, comp, s) for m, comp, s in pulled], ignore_index=True))
+
+    now, before, recent = season_features(standings_now, pl_matches_now, standings_prev,
+                                          pl_matches_prev, elc_matches_prev, season,
+                                          ratings=ratings if elo_form else None, competition=competition)
+    state = IncrementalStats.from_matches(season, pl_matches_now, before)
+    if h2h is not None:
+        with span("build.h2h"):
+            for matches, _, _ in pulled:
+                h2h.fold(matches)
+    return assemble(standings_now, now, before, recent), state
+
+
+@timed("build.incremental_refresh")
+def incremental_refresh(state, h2h=None, ratings=None, elo_form=False, competition=PL):
+    """Fold in only the matches after the state's watermark (into `h2h` and `ratings` too, when given)."""
+    window = incremental_window(state)
+    standings_now, new = client().gather(
+        lambda: pull_standings(competition, state.season),
+        lambda: pull_matches(competition, state.season, **window),
+    )
+    return fold_new(state, standings_now, new, h2h, ratings, elo_form, competition)
+
+
+def incremental_window(state):
+    """pull_matches date range covering everything after the state's watermark."""
+    if state.watermark is None:
+        return {}
+    return {"date_from": pd.Timestamp(state.watermark).strftime("%Y-%m-%d"),
+            "date_to": datetime.now(timezone.utc).strftime("%Y-%m-%d")}
+
+
+def fold_new(state, standings_now, new, h2h=None, ratings=None, elo_form=False, competition=PL):
+    """incremental_refresh on already-pulled frames."""
+    with span("build.fold"):
+        folded = state.fold(new)
+        if h2h is not None:
+            h2h.fold(new)
+        if ratings is not None:
+            ratings.fold(tag(new, competition, state.season))
+    metrics.incr("build.folded_matches", folded)
+    return assemble(standings_now, state.split_frame(), state.split_frame(previous=True),
+                    state.form_frame(standings_now, ratings if elo_form else None)), state
+
+
+def load_state(path=None):
+    path = path or partition().state
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return IncrementalStats.from_dict(json.load(f))
+
+
+def save_state(state, path=None):
+    path = path or partition().state
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(state.to_dict(), f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the processed team stats table")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fold in only matches finished since the last run")
+    parser.add_argument("--verify", action="store_true",
+                        help="after an incremental run, check it against a full rebuild")
+    parser.add_argument("--elo-form", action="store_true",
+                        help="weight recent form by opponents' Elo ratings instead of the standings")
+    parser.add_argument("--competition", default=DEFAULT_COMPETITION,
+                        help="competition code to build (written to its own data partition)")
+    args = parser.parse_args()
+
+    SEASON = season_start()
+    COMPETITION = competition_code(args.competition)
+
+    print(f"Building team strength dataset for {partition(COMPETITION).name}...")
+
+    # Same stages as scripts/refresh_data.py, limited to team stats; head-to-head
+    # history and ratings accumulate across runs, seasons and competitions
+    from scripts.refresh_data import refresh
+    api_key(required=True)
+    results = refresh([COMPETITION], outputs=["team_stats"],
+                      incremental=args.incremental or args.verify, elo_form=args.elo_form, season=SEASON)
+    out, state = results[f"{COMPETITION}.team_stats"]
+    print(f"✅ {partition(COMPETITION).stats} (+ .csv) and {H2H_PATH} ({len(results['h2h'])} pairs) "
+          f"published in snapshot {results['snapshot']}")
     print(out.head())
+    if state.watermark is not None:
+        print(f"Watermark now {state.watermark}")
+
+    if args.verify:
+        full, _ = full_refresh(SEASON, ratings=results["ratings"], elo_form=args.elo_form, competition=COMPETITION)
+        if full.to_csv(index=False) == out.to_csv(index=False):
+            print("✅ Incremental output matches a full rebuild.")
+        else:
+            diff = [c for c in full.columns if not full[c].equals(out.get(c))]
+            print(f"❌ Incremental output differs from a full rebuild in: {diff}")
+            sys.exit(1)
+
+    dump_jsonl(source="build_team_stats")
@@ -0,0 +1,82 @@
+# scripts/check_memory.py
+# Measure per-process memory of N model-serving processes
+#
+#   python scripts/check_memory.py --procs 4
+#   python scripts/check_memory.py --procs 4 --copy   # private copies, for comparison
+#
+# Each process loads the model, scores every team pair once, then reports
+# its RSS / PSS and shared vs private pages from /proc/self/smaps_rollup.
+# With the memory-mapped flat forest the node arrays show up as
+# Shared_Clean and PSS drops roughly by 1/N per extra process.
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIELDS = ["Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"]
+
+
+def smaps_rollup():
+    """Memory fields of this process in MiB (Linux only)."""
+    out = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in FIELDS:
+                out[key] = int(rest.split()[0]) / 1024
+    return out
+
+
+def worker(copy, loaded, results):
+    from src.constants import FLAT_MODEL_PATH
+    from src.data_loader import load_team_table
+    from src.predictor import load_flat_forest, load_model, predict_matches
+
+    model, le, class_order = load_model()
+    if copy and os.path.isdir(FLAT_MODEL_PATH):
+        model = load_flat_forest(FLAT_MODEL_PATH, mmap=False)
+    table = load_team_table()
+    teams = list(table.teams)
+    pairs = [(h, a) for h in teams for a in teams if h != a]
+    predict_matches(model, le, class_order, table, pairs)
+
+    # Measure once every process has loaded, so PSS splits shared pages evenly
+    loaded.wait()
+    results.put((os.getpid(), smaps_rollup()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-process memory of model-serving processes")
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--copy", action="store_true",
+                        help="load the flat forest into private memory instead of mapping it")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("❌ /proc/self/smaps_rollup is not available on this platform.")
+
+    ctx = mp.get_context("spawn")
+    loaded = ctx.Barrier(args.procs + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(args.copy, loaded, results)) for _ in range(args.procs)]
+    for p in procs:
+        p.start()
+    loaded.wait()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    mode = "private copy" if args.copy else "memory-mapped"
+    print(f"📊 {args.procs} process(es), flat forest {mode} (MiB)")
+    print(f"{'pid':>8} " + " ".join(f"{k:>14}" for k in FIELDS))
+    for pid, mem in sorted(rows):
+        print(f"{pid:>8} " + " ".join(f"{mem.get(k, 0):>14.1f}" for k in FIELDS))
+    total_pss = sum(mem.get("Pss", 0) for _, mem in rows)
+    print(f"\n✅ Total PSS: {total_pss:.1f} MiB ({total_pss / len(rows):.1f} per process)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# scripts/export_forest.py
+# Flatten models/team_model.joblib into the flat-array artifact served by src.predictor
+
+import os
+import sys
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.constants import MODEL_PATH, FLAT_MODEL_PATH
+from src.predictor import flatten_forest, save_flat_forest
+
+
+def export_forest(model, path=FLAT_MODEL_PATH, check_rows=None):
+    """Write the flat artifact and check it reproduces sklearn's probabilities."""
+    forest = flatten_forest(model)
+    if check_rows is not None and len(check_rows):
+        expected = model.predict_proba(check_rows)
+        actual = forest.predict_proba(check_rows)
+        if not np.allclose(actual, expected, rtol=0, atol=1e-9):
+            raise ValueError("Flat forest does not match sklearn predict_proba.")
+    save_flat_forest(forest, path)
+    return forest
+
+
+if __name__ == "__main__":
+    model = joblib.load(MODEL_PATH)
+    rng = np.random.default_rng(0)
+    rows = rng.normal(0, 20, size=(2000, model.n_features_in_))
+    export_forest(model, FLAT_MODEL_PATH, check_rows=rows)
+    print(f"✅ Exported {len(model.estimators_)} trees to {FLAT_MODEL_PATH}")
@@ -0,0 +1,186 @@
+# scripts/refresh_data.py
+# One refresh for everything under data/: pull each football-data.org payload
+# once, build the league tables, team stats, head-to-head index and ratings
+# from it, write all of that into a new snapshot and publish it atomically
+# (see src/snapshots.py). A running app or service picks the new snapshot
+# up on its own.
+#
+#   python scripts/refresh_data.py                         # PL, incremental when possible
+#   python scripts/refresh_data.py --competitions PL BL1 --full
+#   python scripts/refresh_data.py --only overview --plan  # print the stages, run nothing
+
+import argparse
+import os
+import shutil
+import sys
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.build_team_stats import (
+    PREV_SEASON_MAX_AGE, client, fold_new, incremental_window, load_state, matches_request,
+    parse_matches, parse_standings, rebuild, save_state, season_start, standings_request,
+)
+from scripts.update_team_overview import parse_overview
+from src.competitions import competition_code, data_outputs, partition
+from src.constants import COMPETITIONS, DATA_DIR, DEFAULT_COMPETITION, H2H_PATH, LOWER_DIVISION, RATINGS_PATH
+from src.data_loader import save_team_overview, save_team_stats
+from src.fd_client import api_key
+from src.h2h import HeadToHead, load_h2h, save_h2h
+from src.metrics import dump_jsonl, timed
+from src.ratings import EloRatings, load_ratings, save_ratings
+from src.refresh import Pipeline
+from src.snapshots import carry_over, data_path, data_root, new_version, publish, stage_snapshot
+
+OUTPUTS = ["overview", "team_stats"]
+# Shared across competitions; folded by every team_stats stage
+SHARED_OUTPUTS = [os.path.relpath(path, DATA_DIR) for path in (H2H_PATH, RATINGS_PATH)]
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def _pull(pipe, comp, kind, request, max_age=None):
+    """Stage fetching one raw payload; the same request is only ever added once."""
+    name = f"{comp}.{kind}"
+    if name not in pipe:
+        path, params = request
+        pipe.add(name, lambda: client().get(path, params, max_age=max_age))
+    return name
+
+
+def _full_stage(comp, season, elo_form):
+    def run(h2h, ratings, standings, matches, standings_prev, matches_prev, lower_prev=None):
+        return rebuild(season, parse_standings(standings), parse_matches(matches),
+                       parse_standings(standings_prev), parse_matches(matches_prev),
+                       parse_matches(lower_prev) if lower_prev is not None else None,
+                       h2h=h2h, ratings=ratings, elo_form=elo_form, competition=comp)
+    return run
+
+
+def _incremental_stage(comp, state, elo_form):
+    def run(h2h, ratings, standings, new):
+        return fold_new(state, parse_standings(standings), parse_matches(new),
+                        h2h, ratings, elo_form, comp)
+    return run
+
+
+def refresh_pipeline(competitions, season, outputs=OUTPUTS, incremental=True, elo_form=False):
+    """Stages for one refresh, ending in "snapshot" (the published snapshot's path).
+
+    Standings feed both the overview and the team stats; the previous
+    season of a lower division is shared with that division's own build.
+    Team stats stages fold into the shared h2h index and ratings, so they
+    run one competition after another.
+    """
+    pipe = Pipeline(max_workers=client().max_workers)
+    built, previous = [], None
+    if "team_stats" in outputs:
+        pipe.add("h2h", lambda: load_h2h() or HeadToHead())
+        pipe.add("ratings", lambda: load_ratings() or EloRatings())
+        built += ["h2h", "ratings"]
+
+    for comp in competitions:
+        standings = _pull(pipe, comp, f"standings.{season}", standings_request(comp, season))
+        if "overview" in outputs:
+            built.append(pipe.add(f"{comp}.overview", parse_overview, [standings]))
+        if "team_stats" not in outputs:
+            continue
+
+        state = load_state(partition(comp).state) if incremental else None
+        if state is not None and state.season == season:
+            new = _pull(pipe, comp, f"matches_new.{season}",
+                        matches_request(comp, season, **incremental_window(state)))
+            stage, deps = _incremental_stage(comp, state, elo_form), [standings, new]
+        else:
+            old, lower = PREV_SEASON_MAX_AGE, LOWER_DIVISION.get(comp)
+            deps = [standings,
+                    _pull(pipe, comp, f"matches.{season}", matches_request(comp, season)),
+                    _pull(pipe, comp, f"standings.{season - 1}", standings_request(comp, season - 1), old),
+                    _pull(pipe, comp, f"matches.{season - 1}", matches_request(comp, season - 1), old)]
+            if lower:
+                deps.append(_pull(pipe, lower, f"matches.{season - 1}", matches_request(lower, season - 1), old))
+            stage = _full_stage(comp, season, elo_form)
+        previous = pipe.add(f"{comp}.team_stats", stage, ["h2h", "ratings"] + deps,
+                            after=[previous] if previous else [])
+        built.append(previous)
+
+    pipe.add("snapshot", lambda *values: write_snapshot(dict(zip(built, values))), built)
+    return pipe
+
+
+# -----------------------------
+# Snapshot
+# -----------------------------
+def save_outputs(results, root):
+    """Write the outputs of a refresh ("<comp>.overview", "<comp>.team_stats", "h2h", "ratings") under `root`."""
+    for name, value in results.items():
+        if name == "h2h":
+            save_h2h(value, data_path(H2H_PATH, root))
+        elif name == "ratings":
+            save_ratings(value, data_path(RATINGS_PATH, root))
+        else:
+            comp, kind = name.split(".")
+            p = partition(comp, root)
+            if kind == "overview":
+                save_team_overview(value, p.overview)
+            else:
+                frame, state = value
+                save_team_stats(frame, p.stats)
+                save_state(state, p.state)
+
+
+@timed("refresh.write_snapshot")
+def write_snapshot(results):
+    """New snapshot with `results` written and everything else carried over, then published."""
+    version = new_version()
+    previous = data_root()
+    staging = stage_snapshot(version)
+    try:
+        save_outputs(results, staging)
+        # Never link over a file written above: links share the old snapshot's inode
+        rel_paths = [rel for code in COMPETITIONS for rel in data_outputs(code)] + SHARED_OUTPUTS
+        carry_over(previous, staging, [rel for rel in rel_paths
+                                       if not os.path.exists(os.path.join(staging, rel))])
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return publish(staging, version)
+
+
+def refresh(competitions=None, outputs=OUTPUTS, incremental=True, elo_form=False, season=None):
+    """Run the refresh DAG; returns stage name -> result ("snapshot" is the new snapshot's path)."""
+    competitions = [competition_code(c) for c in competitions or [DEFAULT_COMPETITION]]
+    return refresh_pipeline(competitions, season or season_start(), outputs, incremental, elo_form).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh all data into a new snapshot")
+    parser.add_argument("--competitions", nargs="+", default=[DEFAULT_COMPETITION],
+                        help="competition codes to refresh (default: PL); others are carried over")
+    parser.add_argument("--only", nargs="+", choices=OUTPUTS, default=OUTPUTS,
+                        help="outputs to rebuild (default: all)")
+    parser.add_argument("--full", action="store_true",
+                        help="pull whole seasons even where an incremental state exists")
+    parser.add_argument("--elo-form", action="store_true",
+                        help="weight recent form by opponents' Elo ratings instead of the standings")
+    parser.add_argument("--plan", action="store_true", help="print the stages level by level and exit")
+    args = parser.parse_args()
+
+    competitions = [competition_code(c) for c in args.competitions]
+    if args.plan:
+        pipe = refresh_pipeline(competitions, season_start(), args.only, not args.full, args.elo_form)
+        for i, level in enumerate(pipe.levels()):
+            print(f"{i}: {', '.join(level)}")
+        sys.exit(0)
+
+    api_key(required=True)
+    results = refresh(competitions, args.only, not args.full, args.elo_form)
+    for comp in competitions:
+        if f"{comp}.team_stats" in results:
+            print(f"  {comp}: {len(results[f'{comp}.team_stats'][0])} teams in team stats")
+        if f"{comp}.overview" in results:
+            print(f"  {comp}: {len(results[f'{comp}.overview'])} teams in the overview")
+    print(f"✅ Published snapshot {results['snapshot']}")
+    dump_jsonl(source="refresh_data")
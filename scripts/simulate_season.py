@@ -0,0 +1,55 @@
+# scripts/simulate_season.py
+# Final-table probabilities from Monte Carlo runs of the remaining fixtures
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_loader import load_overview_table, load_team_table
+from src.predictor import load_model, predict_matches
+from src.simulator import remaining_fixtures, simulate_season
+from src.competitions import competition_code, report_dir
+from scripts.build_team_stats import pull_matches, season_start
+
+REPORT_DIR = "reports"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the rest of a league season")
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes (results don't depend on this)")
+    parser.add_argument("--season", type=int, default=None,
+                        help="season start year (default: current season)")
+    parser.add_argument("--competition", default=None, help="competition code (default: PL)")
+    args = parser.parse_args()
+
+    competition = competition_code(args.competition)
+    season = args.season or season_start()
+    fixtures = remaining_fixtures(pull_matches(competition, season))
+    overview = load_overview_table(competition).to_frame()
+    print(f"✅ {len(fixtures)} fixtures left for {len(overview)} teams")
+
+    # One model call for every remaining fixture
+    model, le, class_order = load_model(competition=competition)
+    pairs = list(zip(fixtures["home_team"], fixtures["away_team"]))
+    probs = predict_matches(model, le, class_order, load_team_table(competition), pairs)
+
+    started = time.perf_counter()
+    summary, positions = simulate_season(overview, fixtures, probs, n_sims=args.sims,
+                                         seed=args.seed, workers=args.workers)
+    print(f"🎲 {args.sims:,} simulations in {time.perf_counter() - started:.2f}s\n")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    out_dir = report_dir(competition, REPORT_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    summary.to_csv(os.path.join(out_dir, "season_simulation.csv"), index=False)
+    positions.to_csv(os.path.join(out_dir, "season_positions.csv"))
+    print(f"\n📝 Wrote {out_dir}/season_simulation.csv and season_positions.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,328 @@
 # scripts/train_team_model.py
 
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report
-import matplotlib.pyplot as plt
-import joblib
+import argparse
+import itertools
 import json
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.metrics import classification_report, log_loss, accuracy_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.competitions import competition_code, partition, report_dir
+from src.constants import FEATURE_COLUMNS
+from src.predictor import linear_from_sklearn, save_linear_model
+from src.data_loader import load_team_data
+from src.matchups import build_matchups
+from src.asof import asof_features
+from scripts.export_forest import export_forest
+
+REPORT_DIR = "reports"
 
-# Load the team stats
-df = pd.read_csv("data/pl_team_stats.csv")
+# Fixed configuration used when no search is requested
+BASE_PARAMS = {"n_estimators": 600, "random_state": 42, "class_weight": "balanced"}
 
-# Ensure required columns are present
-required_cols = {
-    "team", "points", "goal_diff", "form_total", "strength_weighted_form"
+# Candidates for --search (combined with BASE_PARAMS)
+PARAM_GRID = {
+    "n_estimators": [300, 600],
+    "max_depth": [None, 8, 16],
+    "min_samples_leaf": [1, 3],
 }
-missing = required_cols - set(df.columns)
-if missing:
-    raise ValueError(f"pl_team_stats.csv is missing columns: {missing}")
 
-print("✅ Loaded pl_team_stats.csv with columns:", list(df.columns))
+
+def load_stats(competition=None):
+    path = partition(competition).stats
+    df = load_team_data(competition)
+
+    # Ensure required columns are present
+    required_cols = {
+        "team", "points", "goal_diff", "form_total", "strength_weighted_form"
+    }
+    missing = required_cols - set(df.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {missing}")
+
+    print(f"✅ Loaded {path} with columns:", list(df.columns))
+    return df
+
+
+def parse_seasons(spec):
+    """'2019-2024' or '2022,2023' -> list of season start years."""
+    if "-" in spec:
+        first, last = (int(v) for v in spec.split("-", 1))
+        return list(range(first, last + 1))
+    return [int(v) for v in spec.split(",")]
+
+
+def load_history(seasons, competitions=("PL",)):
+    """Real matches with leakage-free pre-kickoff features (see src.asof)."""
+    from scripts.build_team_stats import PREV_SEASON_MAX_AGE, pull_matches, tag
+
+    frames = [tag(pull_matches(comp, season, max_age=PREV_SEASON_MAX_AGE), comp, season)
+              for comp in competitions for season in seasons]
+    history = asof_features(pd.concat(frames, ignore_index=True))
+    print(f"✅ Built {len(history)} historical rows from {len(seasons)} season(s) of {', '.join(competitions)}")
+    return history
+
 
 # -----------------------------
-# Build synthetic matchups table
+# Parallel hyperparameter search
 # -----------------------------
-matchups = []
-teams = df["team"].tolist()
-
-for home in teams:
-    for away in teams:
-        if home == away:
-            continue
-        home_row = df.loc[df["team"] == home].iloc[0]
-        away_row = df.loc[df["team"] == away].iloc[0]
-
-        matchups.append({
-            "home_team": home,
-            "away_team": away,
-            "home_points": home_row["points"],
-            "away_points": away_row["points"],
-            "home_goal_diff": home_row["goal_diff"],
-            "away_goal_diff": away_row["goal_diff"],
-            "home_form": home_row["form_total"],
-            "away_form": away_row["form_total"],
-            "home_weighted_form": home_row["strength_weighted_form"],
-            "away_weighted_form": away_row["strength_weighted_form"],
+def _score_fold(data_path, params, train_idx, test_idx):
+    """Fit one candidate on one CV fold; X/y are memory-mapped, not copied."""
+    X, y = joblib.load(data_path, mmap_mode="r")
+    started = time.perf_counter()
+    model = RandomForestClassifier(**{**BASE_PARAMS, **params, "n_jobs": 1})
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - started
+    proba = model.predict_proba(X[test_idx])
+    return {
+        "log_loss": log_loss(y[test_idx], proba, labels=np.arange(proba.shape[1])),
+        "accuracy": accuracy_score(y[test_idx], model.classes_[proba.argmax(axis=1)]),
+        "fit_seconds": fit_seconds,
+    }
+
+
+def search(X, y, grid=PARAM_GRID, n_splits=5, workers=None):
+    """Score every grid candidate with stratified CV on a process pool.
+
+    Each (candidate, fold) pair is one task; the feature matrix is dumped
+    once and every worker maps the same file read-only.
+    """
+    candidates = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+    n_splits = max(2, min(n_splits, np.bincount(y).min()))
+    folds = list(StratifiedKFold(n_splits, shuffle=True, random_state=42).split(X, y))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "train.joblib")
+        joblib.dump((np.ascontiguousarray(X, dtype=np.float64), np.asarray(y)), data_path)
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {(i, f): pool.submit(_score_fold, data_path, params, train, test)
+                       for i, params in enumerate(candidates)
+                       for f, (train, test) in enumerate(folds)}
+            scores = {key: future.result() for key, future in futures.items()}
+
+    results = []
+    for i, params in enumerate(candidates):
+        fold_scores = [scores[(i, f)] for f in range(len(folds))]
+        results.append({
+            "params": params,
+            "mean_log_loss": float(np.mean([s["log_loss"] for s in fold_scores])),
+            "mean_accuracy": float(np.mean([s["accuracy"] for s in fold_scores])),
+            "mean_fit_seconds": float(np.mean([s["fit_seconds"] for s in fold_scores])),
         })
+    results.sort(key=lambda r: r["mean_log_loss"])
+    return results
 
-matchups_df = pd.DataFrame(matchups)
-print("✅ Built matchups_df with columns:", list(matchups_df.columns))
 
-# -----------------------------
-# Create proxy target
-# -----------------------------
-matchups_df["result"] = matchups_df.apply(
-    lambda r: "HomeWin" if r["home_points"] > r["away_points"]
-    else ("AwayWin" if r["away_points"] > r["home_points"] else "Draw"),
-    axis=1
-)
+def fit_linear(X, y):
+    """Multinomial logistic model on standardized features, exported for NumPy scoring."""
+    X = np.asarray(X, dtype=np.float64)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression(max_iter=1000, class_weight="balanced")
+    model.fit(scaler.transform(X), y)
+    return linear_from_sklearn(model, scaler)
 
-# -----------------------------
-# Features and label
-# -----------------------------
-train_features = [
-    "home_points", "away_points",
-    "home_goal_diff", "away_goal_diff",
-    "home_form", "away_form",
-    "home_weighted_form", "away_weighted_form",
-]
 
-X = matchups_df[train_features]
+def save_artifacts(model, le, X, linear=None, competition=None):
+    """Write the model, label encoder, flat forest, linear model and class order
+    into the competition's model partition. Returns the flat forest.
+    """
+    p = partition(competition)
+    os.makedirs(p.model_dir, exist_ok=True)
+
+    # Trained on every core; whoever loads it must not fan predict_proba out
+    # across cores next to the service's own worker processes
+    model.set_params(n_jobs=None)
+    joblib.dump(model, p.model)
+    joblib.dump(le, p.label_encoder)
+    forest = export_forest(model, p.flat_model, check_rows=X)
+    if linear is not None:
+        save_linear_model(linear, p.linear_model)
+
+    with open(p.classes, "w") as f:
+        json.dump(list(le.classes_), f)
+    return forest
 
-le = LabelEncoder()
-y = le.fit_transform(matchups_df["result"])
 
 # -----------------------------
-# Split and train
+# Backend comparison
 # -----------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
+def _latency(fn, X, repeat=200):
+    """Median seconds per call of fn(X)."""
+    fn(X)
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - t)
+    return float(np.median(samples))
 
-model = RandomForestClassifier(
-    n_estimators=600,
-    random_state=42,
-    class_weight="balanced"
-)
 
-print("\n🚀 Training model...")
-model.fit(X_train, y_train)
+def compare_backends(backends, X_test, y_test, batch_size=1000):
+    """Held-out log-loss/accuracy and scoring latency of each serving backend."""
+    X_test = np.asarray(X_test, dtype=np.float64)
+    batch = X_test[np.arange(batch_size) % len(X_test)]
+    results = {}
+    for name, model in backends.items():
+        proba = model.predict_proba(X_test)
+        results[name] = {
+            "log_loss": float(log_loss(y_test, proba, labels=np.arange(proba.shape[1]))),
+            "accuracy": float(accuracy_score(y_test, model.classes_[proba.argmax(axis=1)])),
+            "latency_single_us": _latency(model.predict_proba, X_test[:1]) * 1e6,
+            f"latency_batch_{batch_size}_us_per_row": _latency(model.predict_proba, batch, 20) * 1e6 / batch_size,
+        }
+    return results
 
-print("\n✅ Model Performance:")
-y_pred = model.predict(X_test)
-print(classification_report(y_test, y_pred, target_names=le.classes_))
 
 # -----------------------------
-# Feature importance
+# Reports
 # -----------------------------
-importances = model.feature_importances_
-plt.bar(train_features, importances)
-plt.title("Feature Importance")
-plt.ylabel("Importance")
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.show()
+def save_feature_importance(features, importances, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
-# -----------------------------
-# Save model, encoder, and class order
-# -----------------------------
-os.makedirs("models", exist_ok=True)
+    plt.figure()
+    plt.bar(features, importances)
+    plt.title("Feature Importance")
+    plt.ylabel("Importance")
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the team-strength match model")
+    parser.add_argument("--search", action="store_true",
+                        help="run a parallel hyperparameter/CV search before the final fit")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes for --search (default: all cores)")
+    parser.add_argument("--historical", metavar="SEASONS",
+                        help="train on real matches with as-of features, e.g. 2019-2024")
+    parser.add_argument("--competition", default=None,
+                        help="competition whose data and model partition to use (default: PL)")
+    parser.add_argument("--competitions", default=None,
+                        help="comma-separated competition codes for --historical (default: --competition)")
+    args = parser.parse_args()
+    competition = competition_code(args.competition)
+    competitions = args.competitions or competition
+    out_dir = report_dir(competition, REPORT_DIR)
+
+    timings = {}
+    started = time.perf_counter()
+    if args.historical:
+        # Label: actual result; features as they stood before kickoff
+        matchups_df = load_history(parse_seasons(args.historical), competitions.split(","))
+    else:
+        # -----------------------------
+        # Build synthetic matchups table
+        # -----------------------------
+        # Label: proxy target from points (see src.matchups.label_results)
+        matchups_df = build_matchups(load_stats(competition))
+        print("✅ Built matchups_df with columns:", list(matchups_df.columns))
+    timings["load_and_build_seconds"] = time.perf_counter() - started
+
+    # -----------------------------
+    # Features and label
+    # -----------------------------
+    train_features = FEATURE_COLUMNS
+
+    X = matchups_df[train_features]
+
+    le = LabelEncoder()
+    y = le.fit_transform(matchups_df["result"])
+
+    # -----------------------------
+    # Split and train
+    # -----------------------------
+    if args.historical:
+        # Rows are in kickoff order: hold out the most recent matches
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+
+    params = dict(BASE_PARAMS)
+    search_results = None
+    if args.search:
+        print("\n🔎 Searching hyperparameters...")
+        t = time.perf_counter()
+        search_results = search(X_train.to_numpy(), y_train, workers=args.workers)
+        timings["search_seconds"] = time.perf_counter() - t
+        params.update(search_results[0]["params"])
+        print(f"✅ Best params: {search_results[0]['params']} "
+              f"(log-loss {search_results[0]['mean_log_loss']:.4f})")
+
+    model = RandomForestClassifier(**params, n_jobs=-1)
+
+    print("\n🚀 Training model...")
+    t = time.perf_counter()
+    model.fit(X_train, y_train)
+    timings["fit_seconds"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    linear = fit_linear(X_train, y_train)
+    timings["fit_linear_seconds"] = time.perf_counter() - t
+
+    print("\n✅ Model Performance:")
+    y_pred = model.predict(X_test)
+    print(classification_report(y_test, y_pred, target_names=le.classes_))
+
+    # -----------------------------
+    # Save model, encoder, and class order
+    # -----------------------------
+    forest = save_artifacts(model, le, X, linear, competition)
+    print(f"\n✅ Saved team_model.joblib, team_model_flat/, team_model_linear/, "
+          f"label_encoder.joblib, and model_classes.json for {competition}")
+
+    # -----------------------------
+    # Compare serving backends on the held-out rows
+    # -----------------------------
+    backends = compare_backends({"forest": forest, "linear": linear}, X_test, y_test)
+    print("\n📊 Serving backends (held-out):")
+    for name, b in backends.items():
+        print(f"  {name:<8} log-loss {b['log_loss']:.4f}  accuracy {b['accuracy']:.3f}  "
+              f"single {b['latency_single_us']:.1f}µs  batch {b['latency_batch_1000_us_per_row']:.2f}µs/row")
+
+    # -----------------------------
+    # Feature importance and training report
+    # -----------------------------
+    os.makedirs(out_dir, exist_ok=True)
+    save_feature_importance(train_features, model.feature_importances_,
+                            os.path.join(out_dir, "feature_importance.png"))
+    timings["total_seconds"] = time.perf_counter() - started
 
-joblib.dump(model, "models/team_model.joblib")
-joblib.dump(le, "models/label_encoder.joblib")
+    report = {
+        "params": params,
+        "competition": competition,
+        "labels": f"historical {args.historical} {competitions}" if args.historical else "synthetic",
+        "n_rows": int(len(X)),
+        "timings": timings,
+        "test_report": classification_report(y_test, y_pred, target_names=le.classes_, output_dict=True),
+        "feature_importance": dict(zip(train_features, model.feature_importances_.tolist())),
+        "search": search_results,
+        "backends": backends,
+    }
+    with open(os.path.join(out_dir, "training_report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    with open(os.path.join(out_dir, "backend_comparison.json"), "w") as f:
+        json.dump(backends, f, indent=2)
+    print(f"📝 Wrote {out_dir}/training_report.json, backend_comparison.json and feature_importance.png")
 
-with open("model_classes.json", "w") as f:
-    json.dump(list(le.classes_), f)
 
-print("\n✅ Saved team_model.joblib, label_encoder.joblib, and model_classes.json")
+if __name__ == "__main__":
+    main()
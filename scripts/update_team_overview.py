@@ -1,23 +1,18 @@
-import requests
 import pandas as pd
+import argparse
 import os
+import sys
 
 from dotenv import load_dotenv
 load_dotenv()
 
-def update_team_overview():
-    API_KEY = os.getenv("FOOTBALL_API_KEY")  # secure environment variable
-    if not API_KEY:
-        raise ValueError("Missing FOOTBALL_API_KEY environment variable.")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.competitions import competition_code, partition
+from src.fd_client import api_key
+from src.metrics import dump_jsonl
 
-    url = "https://api.football-data.org/v4/competitions/PL/standings"
-    headers = {"X-Auth-Token": API_KEY}
-
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch data: {response.status_code}")
-
-    data = response.json()
+def parse_overview(data):
+    """League table rows (with positions) from a standings payload."""
     standings = data["standings"][0]["table"]
 
     teams_data = []
@@ -34,10 +29,19 @@ def update_team_overview():
             "points": team["points"]
         })
 
-    df = pd.DataFrame(teams_data)
-    os.makedirs("data", exist_ok=True)
-    df.to_csv("data/team_overview.csv", index=False)
-    print("✅ Team overview updated successfully!")
+    return pd.DataFrame(teams_data)
+
+def update_team_overview(competition=None):
+    # Runs the overview stages of scripts/refresh_data.py and publishes a new snapshot
+    from scripts.refresh_data import refresh
+    competition = competition_code(competition)
+    api_key(required=True)
+    results = refresh([competition], outputs=["overview"])
+    print(f"✅ Team overview updated successfully! ({partition(competition).overview}, "
+          f"snapshot {results['snapshot']})")
 
 if __name__ == "__main__":
-    update_team_overview()
+    parser = argparse.ArgumentParser(description="Refresh the league table shown in the app")
+    parser.add_argument("--competition", default=None, help="competition code (default: PL)")
+    update_team_overview(parser.parse_args().competition)
+    dump_jsonl(source="update_team_overview")
@@ -0,0 +1,132 @@
+# src/asof.py
+# Point-in-time team features for every historical match
+#
+# Each finished match gets both teams' points, goal difference, last-5 form
+# and strength-weighted form as they stood just before kickoff, using only
+# earlier matches of the same competition/season. Everything is computed on
+# one date-sorted per-team timeline: running totals are cumulative sums,
+# form is a positional lag within each team's rows, and opponent ratings
+# come from a single merge_asof against the same timeline.
+
+import numpy as np
+import pandas as pd
+
+from src.features import _keys
+from src.matchups import label_results
+from src.store import FORM_PAD
+
+TIMELINE_FEATURES = ["played", "points", "goal_diff", "form_total", "strength_weighted_form"]
+
+
+def team_timeline(matches: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """One row per team per finished match with that team's pre-kickoff features.
+
+    Needs `id`, `utcDate`, `homeTeam`, `awayTeam`, `homeScore` and
+    `awayScore` columns (as from `pull_matches`), plus optional
+    competition/season columns. `form_last_<n>` holds int8 rows (oldest
+    first, padded with FORM_PAD) like the stored team tables.
+    """
+    keys = _keys(matches)
+    done = matches[matches["homeScore"].notna() & matches["awayScore"].notna()]
+    hs = done["homeScore"].to_numpy(dtype=np.int64)
+    as_ = done["awayScore"].to_numpy(dtype=np.int64)
+
+    def side(team, opponent, gf, ga, is_home):
+        return pd.DataFrame({
+            **{k: done[k].to_numpy() for k in keys},
+            "id": done["id"].to_numpy(),
+            "utcDate": done["utcDate"].to_numpy(),
+            "team": done[team].to_numpy(),
+            "opponent": done[opponent].to_numpy(),
+            "gd": gf - ga,
+            "result": np.sign(gf - ga),
+            "is_home": is_home,
+        })
+
+    long = pd.concat([side("homeTeam", "awayTeam", hs, as_, True),
+                      side("awayTeam", "homeTeam", as_, hs, False)], ignore_index=True)
+    long = long.sort_values(keys + ["team", "utcDate"], kind="stable", ignore_index=True)
+
+    # Position of each row within its (competition, season, team) run
+    group = pd.MultiIndex.from_frame(long[keys + ["team"]]) if keys else long["team"]
+    codes, _ = pd.factorize(group)
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    pos = np.arange(len(long)) - np.repeat(starts, np.diff(np.r_[starts, len(long)]))
+
+    result = long["result"].to_numpy()
+    pts = np.select([result == 1, result == 0], [3, 1], 0)
+    cum_pts = _group_cumsum(pts, starts)
+    cum_gd = _group_cumsum(long["gd"].to_numpy(), starts)
+    long["played"] = pos
+    long["points"] = cum_pts - pts
+    long["goal_diff"] = cum_gd - long["gd"].to_numpy()
+    long["points_after"] = cum_pts
+    long["gd_after"] = cum_gd
+
+    # Last-n results before kickoff: lag k is row i-k of the same team
+    rows = np.arange(len(long))
+    form = np.full((len(long), n), FORM_PAD, dtype=np.int8)
+    lag_rows, lag_src = [], []
+    for k in range(1, n + 1):
+        valid = pos >= k
+        form[valid, n - k] = result[rows[valid] - k]
+        lag_rows.append(rows[valid])
+        lag_src.append(rows[valid] - k)
+    long[f"form_last_{n}"] = list(form)
+    long["form_total"] = np.where(form == FORM_PAD, 0, form).sum(axis=1)
+
+    # Strength-weighted form: each earlier result times that opponent's
+    # rating as of *this* kickoff, +5 when the team was away
+    lag_rows = np.concatenate(lag_rows)
+    lag_src = np.concatenate(lag_src)
+    probe = pd.DataFrame({
+        **{k: long[k].to_numpy()[lag_rows] for k in keys},
+        "team": long["opponent"].to_numpy()[lag_src],
+        "utcDate": long["utcDate"].to_numpy()[lag_rows],
+        "row": lag_rows,
+        "weight": result[lag_src] * 1.0,
+        "away_bonus": np.where(long["is_home"].to_numpy()[lag_src], 0, 5),
+    }).sort_values("utcDate", kind="stable")
+    ratings = long[keys + ["team", "utcDate", "points_after", "gd_after"]].sort_values("utcDate", kind="stable")
+    probe = pd.merge_asof(probe, ratings, on="utcDate", by=keys + ["team"], allow_exact_matches=False)
+    rating = 0.5 * probe["points_after"].fillna(0) + 0.5 * probe["gd_after"].fillna(0)
+    weighted = probe["weight"] * (rating + probe["away_bonus"])
+    long["strength_weighted_form"] = np.bincount(probe["row"], weighted, len(long))
+
+    return long.drop(columns=["points_after", "gd_after"])
+
+
+def _group_cumsum(values, starts):
+    """Cumulative sum restarting at each index in `starts`."""
+    total = np.cumsum(values)
+    offsets = np.r_[0, total[starts[1:] - 1]]
+    return total - np.repeat(offsets, np.diff(np.r_[starts, len(values)]))
+
+
+def asof_features(matches: pd.DataFrame, n: int = 5) -> pd.DataFrame:
+    """One row per finished match with both sides' pre-kickoff features and the result.
+
+    Columns follow FEATURE_COLUMNS (home_points, away_points, home_goal_diff,
+    ..., home_weighted_form, away_weighted_form) plus home_played /
+    away_played and the actual `result` label.
+    """
+    keys = _keys(matches)
+    timeline = team_timeline(matches, n)
+    names = dict(zip(TIMELINE_FEATURES, ["played", "points", "goal_diff", "form", "weighted_form"]))
+
+    def side(is_home, prefix):
+        rows = timeline[timeline["is_home"] == is_home]
+        out = rows[keys + ["id", "utcDate", "team"]].rename(columns={"team": f"{prefix}_team"})
+        for col, name in names.items():
+            out[f"{prefix}_{name}"] = rows[col].to_numpy()
+        return out
+
+    home = side(True, "home")
+    away = side(False, "away").drop(columns=["utcDate"])
+    out = home.merge(away, on=keys + ["id"], how="inner")
+
+    scores = matches.drop_duplicates("id").set_index("id")[["homeScore", "awayScore"]]
+    hs = scores["homeScore"].reindex(out["id"]).to_numpy()
+    as_ = scores["awayScore"].reindex(out["id"]).to_numpy()
+    out["result"] = label_results(hs, as_)
+    return out.sort_values(["utcDate", "id"], kind="stable", ignore_index=True)
@@ -0,0 +1,111 @@
+# src/assets.py
+# Build step for images: right-sized WebP variants with content-hashed names
+#
+#   python scripts/build_assets.py
+#
+# Every source under assets/ that matches a rule in VARIANTS is resized to
+# twice its rendered CSS width (never upscaled), encoded as WebP and written
+# to static/assets/<dir>/<slug>.<hash>.webp. manifest.json, written last,
+# maps each source path (relative to assets/) to its variant. With
+# Streamlit's static serving on, the app links to the variants by URL, so
+# browsers cache them and reruns send no image bytes at all.
+
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import re
+
+ASSET_DIR = "assets"
+BUILD_DIR = "static/assets"
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+# Streamlit serves ./static/ at app/static/ when server.enableStaticServing is on
+STATIC_URL = "app/static/assets"
+
+# (pattern relative to ASSET_DIR, max width in px, WebP quality); first match wins.
+# Widths are 2x the size style.css renders them at.
+VARIANTS = [
+    ("logos/premier-league.png", 640, 85),  # .pl-logo: 320px
+    ("logos/*.png", 180, 85),               # .team-logo: 90px
+    ("background/*", 1920, 70),             # full-window cover
+]
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _rule(rel_path):
+    for pattern, width, quality in VARIANTS:
+        if fnmatch.fnmatch(rel_path, pattern):
+            return width, quality
+    return None
+
+
+def encode_variant(path, width, quality):
+    """WebP bytes and (width, height) of `path` scaled down to at most `width` px wide."""
+    from PIL import Image
+
+    with Image.open(path) as im:
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+        if im.width > width:
+            im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, "WEBP", quality=quality, method=6)
+        return buf.getvalue(), im.size
+
+
+def build_assets(src=ASSET_DIR, out=BUILD_DIR):
+    """Write variants for every matching source plus the manifest; returns the manifest."""
+    assets = {}
+    for root, _, files in os.walk(src):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, src).replace(os.sep, "/")
+            rule = _rule(rel)
+            if rule is None:
+                continue
+            data, (w, h) = encode_variant(path, *rule)
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            folder = os.path.dirname(rel)
+            file = "/".join(filter(None, [folder, f"{_slug(os.path.splitext(name)[0])}.{digest}.webp"]))
+            target = os.path.join(out, file)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as f:
+                    f.write(data)
+            assets[rel] = {"file": file, "width": w, "height": h,
+                           "bytes": len(data), "source_bytes": os.path.getsize(path)}
+
+    # Drop variants no source points at any more
+    keep = {a["file"] for a in assets.values()}
+    for root, _, files in os.walk(out):
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), out).replace(os.sep, "/")
+            if name.endswith(".webp") and rel not in keep:
+                os.remove(os.path.join(root, name))
+
+    manifest = {"assets": dict(sorted(assets.items()))}
+    tmp = os.path.join(out, "manifest.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out, "manifest.json"))
+    return manifest
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Source path -> variant entry, or None if assets haven't been built."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["assets"]
+    except FileNotFoundError:
+        return None
+
+
+def variant_path(entry, out=BUILD_DIR):
+    return os.path.join(out, entry["file"])
+
+
+def variant_url(entry):
+    return f"{STATIC_URL}/{entry['file']}"
@@ -0,0 +1,170 @@
+# src/competitions.py
+# Per-competition data/model partitions and a bounded LRU for loaded ones
+#
+# The default competition keeps the original flat layout (data/pl_team_stats,
+# models/team_model.joblib, ...); any other code gets the same files under
+# data/<code>/ and models/<code>/. Data paths resolve inside the current
+# snapshot (see src/snapshots.py) when one has been published. Nothing is
+# read until a competition is first asked for, and at most
+# COMPETITION_CACHE_SIZE stay loaded.
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from src import metrics
+from src.constants import (
+    COMPETITIONS, COMPETITION_CACHE_SIZE, DATA_DIR, DEFAULT_COMPETITION, MODEL_DIR,
+    DATA_PROCESSED, TEAM_OVERVIEW_PATH, MODEL_PATH, LABEL_ENCODER_PATH, FLAT_MODEL_PATH, LINEAR_MODEL_PATH,
+)
+from src.snapshots import data_root
+from src.store import manifest_path
+
+CACHE_SIZE_ENV = "FOOTY_COMPETITION_CACHE"
+
+
+class Partition:
+    """File locations for one competition's data and models."""
+
+    def __init__(self, code, data_dir, model_dir, classes_path):
+        self.code = code
+        self.name = COMPETITIONS[code]
+        self.data_dir = data_dir
+        self.model_dir = model_dir
+        self.stats = os.path.join(data_dir, os.path.basename(DATA_PROCESSED))
+        self.overview = os.path.join(data_dir, os.path.basename(TEAM_OVERVIEW_PATH))
+        self.state = os.path.join(data_dir, "team_stats_state.json")
+        self.model = os.path.join(model_dir, os.path.basename(MODEL_PATH))
+        self.label_encoder = os.path.join(model_dir, os.path.basename(LABEL_ENCODER_PATH))
+        self.flat_model = os.path.join(model_dir, os.path.basename(FLAT_MODEL_PATH))
+        self.linear_model = os.path.join(model_dir, os.path.basename(LINEAR_MODEL_PATH))
+        self.classes = classes_path
+
+    def __repr__(self):
+        return f"Partition({self.code!r})"
+
+
+def competition_code(competition=None) -> str:
+    """Upper-cased competition code, defaulting to DEFAULT_COMPETITION."""
+    code = (competition or DEFAULT_COMPETITION).upper()
+    if code not in COMPETITIONS:
+        raise ValueError(f"Unknown competition {competition!r}; choose from {sorted(COMPETITIONS)}")
+    return code
+
+
+def partition(competition=None, root=None) -> Partition:
+    """Paths for a competition, with data under `root` (default: the current snapshot)."""
+    code = competition_code(competition)
+    root = root or data_root()
+    if code == DEFAULT_COMPETITION:
+        return Partition(code, root, MODEL_DIR, "model_classes.json")
+    return Partition(code, os.path.join(root, code), os.path.join(MODEL_DIR, code),
+                     os.path.join(MODEL_DIR, code, "model_classes.json"))
+
+
+def data_outputs(competition=None):
+    """A competition's data files, relative to the data root (what a snapshot holds for it)."""
+    p = partition(competition, root=DATA_DIR)
+    rel = [os.path.relpath(path, DATA_DIR) for path in (p.stats, p.overview, p.state)]
+    return rel + [f"{path}.csv" for path in rel[:2]]
+
+
+def report_dir(competition=None, root="reports") -> str:
+    """Where scripts write a competition's reports: `root`, or `root`/<code>."""
+    code = competition_code(competition)
+    return root if code == DEFAULT_COMPETITION else os.path.join(root, code)
+
+
+def available_competitions():
+    """Codes that have built team stats on disk, default first."""
+    found = []
+    for code in COMPETITIONS:
+        stats = partition(code).stats
+        if os.path.exists(manifest_path(stats)) or os.path.exists(f"{stats}.csv"):
+            found.append(code)
+    return sorted(found, key=lambda c: c != DEFAULT_COMPETITION)
+
+
+def cache_size() -> int:
+    return int(os.environ.get(CACHE_SIZE_ENV) or COMPETITION_CACHE_SIZE)
+
+
+class LRUCache:
+    """At most `capacity` values built on first access by `load(key)`.
+
+    `get` moves a key to the most-recent end; inserting past capacity drops
+    the least recently used entry. Pass `stale` to rebuild an entry whose
+    files changed. Loads run outside the lock, so a slow load never blocks
+    hits on other keys; concurrent misses on one key wait for a single load.
+    """
+
+    def __init__(self, load, capacity=None, name="lru"):
+        self.load = load
+        self.capacity = capacity or cache_size()
+        self.name = name
+        self.entries = OrderedDict()
+        self.loading = {}  # key -> Future of the load in progress
+        self.lock = threading.Lock()
+
+    def get(self, key, stale=None):
+        value = self.peek(key)
+        if value is not None and not (stale is not None and stale(value)):
+            metrics.incr(f"{self.name}.hit")
+            return value
+
+        with self.lock:
+            current = self.entries.get(key)
+            if current is not None and current is not value:
+                # Reloaded by another caller since the check above
+                self.entries.move_to_end(key)
+                metrics.incr(f"{self.name}.hit")
+                return current
+            pending = self.loading.get(key)
+            if pending is None:
+                pending = self.loading[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return pending.result()
+
+        metrics.incr(f"{self.name}.miss")
+        try:
+            value = self.load(key)
+        except BaseException as exc:
+            with self.lock:
+                del self.loading[key]
+            pending.set_exception(exc)
+            raise
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                metrics.incr(f"{self.name}.evicted")
+            del self.loading[key]
+        pending.set_result(value)
+        return value
+
+    def peek(self, key):
+        """The cached value (marked recently used), or None; never loads."""
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
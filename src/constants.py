@@ -1,3 +1,45 @@
-DATA_PROCESSED = "data/processed/pl_team_stats.csv"
+DATA_DIR = "data"
+MODEL_DIR = "models"
+
+# Competitions served from one deployment (football-data.org codes). The
+# default keeps the paths below; every other one is partitioned under
+# data/<code>/ and models/<code>/ (see src/competitions.py).
+DEFAULT_COMPETITION = "PL"
+COMPETITIONS = {
+    "PL": "Premier League",
+    "ELC": "Championship",
+    "BL1": "Bundesliga",
+    "SA": "Serie A",
+    "PD": "Primera Division",
+    "FL1": "Ligue 1",
+    "DED": "Eredivisie",
+    "PPL": "Primeira Liga",
+}
+# Previous-season data for promoted teams comes from the division below
+LOWER_DIVISION = {"PL": "ELC"}
+# Competitions whose tables and models stay loaded at once, per process
+COMPETITION_CACHE_SIZE = 4
+
+# Typed column bundles (see src/store.py); a .csv copy sits next to each
+DATA_PROCESSED = "data/pl_team_stats"
+TEAM_OVERVIEW_PATH = "data/team_overview"
+# Head-to-head index (see src/h2h.py)
+H2H_PATH = "data/h2h.json"
+# Elo rating engine state (see src/ratings.py)
+RATINGS_PATH = "data/ratings.json"
 MODEL_PATH = "models/team_model.joblib"
-LABEL_ENCODER_PATH = "models/label_encoder.joblib"
\ No newline at end of file
+LABEL_ENCODER_PATH = "models/label_encoder.joblib"
+# Flat forest: directory of memory-mappable .npy node arrays (see src/predictor.py)
+FLAT_MODEL_PATH = "models/team_model_flat"
+# Multinomial logistic backend, same layout (see src/predictor.py)
+LINEAR_MODEL_PATH = "models/team_model_linear"
+
+# Feature order used at training time (home/away pairs per team stat)
+TEAM_STAT_COLUMNS = ["points", "goal_diff", "form_total", "strength_weighted_form"]
+FEATURE_COLUMNS = [
+    "home_points", "away_points",
+    "home_goal_diff", "away_goal_diff",
+    "home_form", "away_form",
+    "home_weighted_form", "away_weighted_form",
+]
+OUTCOME_LABELS = ["HomeWin", "Draw", "AwayWin"]
@@ -1,6 +1,61 @@
-import pandas as pd
+from __future__ import annotations
 
-DATA_PROCESSED = "data/pl_team_stats.csv"
+import os
+from typing import TYPE_CHECKING
 
-def load_team_data():
-    return pd.read_csv(DATA_PROCESSED)
+from src.competitions import partition
+from src.metrics import timed
+from src.store import (
+    TEAM_STATS_SCHEMA, TEAM_OVERVIEW_SCHEMA,
+    bundle_to_frame, bundle_version, export_csv, frame_to_columns, read_bundle, write_bundle,
+)
+from src.team_table import TeamTable
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def data_version(path=None):
+    """Cache key for a table (default: team stats): its bundle stamp, else the legacy CSV's mtime."""
+    path = path or partition().stats
+    version = bundle_version(path)
+    if version is None and os.path.exists(f"{path}.csv"):
+        version = os.stat(f"{path}.csv").st_mtime_ns
+    return version
+
+
+def _read_columns(path, schema):
+    if bundle_version(path) is None and os.path.exists(f"{path}.csv"):
+        # Older data directories only have the CSV export
+        import pandas as pd
+        return frame_to_columns(pd.read_csv(f"{path}.csv"), schema)
+    return read_bundle(path)
+
+
+# Every loader takes a competition code (default: DEFAULT_COMPETITION)
+@timed("data_loader.load_team_data")
+def load_team_data(competition=None):
+    return bundle_to_frame(_read_columns(partition(competition).stats, TEAM_STATS_SCHEMA))
+
+@timed("data_loader.load_team_table")
+def load_team_table(competition=None):
+    columns = _read_columns(partition(competition).stats, TEAM_STATS_SCHEMA)
+    return TeamTable(columns["team"].tolist(), columns)
+
+@timed("data_loader.load_overview_table")
+def load_overview_table(competition=None):
+    columns = _read_columns(partition(competition).overview, TEAM_OVERVIEW_SCHEMA)
+    return TeamTable(columns["team"].tolist(), columns)
+
+
+def save_team_stats(frame: pd.DataFrame, path=None, competition=None):
+    path = path or partition(competition).stats
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_bundle(path, frame, TEAM_STATS_SCHEMA)
+    export_csv(frame, f"{path}.csv")
+
+def save_team_overview(frame: pd.DataFrame, path=None, competition=None):
+    path = path or partition(competition).overview
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_bundle(path, frame, TEAM_OVERVIEW_SCHEMA)
+    export_csv(frame, f"{path}.csv")
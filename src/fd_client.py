@@ -0,0 +1,193 @@
+# src/fd_client.py
+# Shared football-data.org client: pooled keep-alive session, on-disk cache
+# with ETag/Last-Modified revalidation, and a token bucket for the rate limit.
+# Every attempt, retries included, takes a token. A 429, 5xx or dropped
+# connection pauses the bucket (for the server's Retry-After, else a
+# backoff) before the retry, so an upstream outage can't exceed the limit.
+
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.metrics import incr, span
+
+BASE_URL = os.getenv("FOOTBALL_DATA_BASE_URL", "https://api.football-data.org/v4")
+CACHE_DIR = "data/cache/http"
+
+# Every script reads the token from one variable; the old overview script
+# used FOOTBALL_API_KEY, which still works as a fallback
+API_KEY_ENV = "FOOTBALL_DATA_API_KEY"
+LEGACY_API_KEY_ENV = "FOOTBALL_API_KEY"
+
+# Free tier: 10 requests per minute
+RATE_LIMIT = 10
+RATE_PERIOD = 60.0
+# Responses worth retrying, in FootballDataClient.get
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def api_key(required=False):
+    """football-data.org token from API_KEY_ENV (or the deprecated LEGACY_API_KEY_ENV)."""
+    key = os.getenv(API_KEY_ENV)
+    if not key and os.getenv(LEGACY_API_KEY_ENV):
+        warnings.warn(f"{LEGACY_API_KEY_ENV} is deprecated; set {API_KEY_ENV} instead", FutureWarning)
+        key = os.getenv(LEGACY_API_KEY_ENV)
+    if required and not key:
+        raise ValueError(f"Missing {API_KEY_ENV} environment variable.")
+    return key
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per `per` seconds, bursts up to `rate`."""
+
+    def __init__(self, rate=RATE_LIMIT, per=RATE_PERIOD, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                if now < self.updated:  # paused
+                    wait = self.updated - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.fill_rate
+            self.sleep(wait)
+
+    def pause(self, seconds):
+        """Hold every caller for `seconds`, then allow one request and refill from there."""
+        with self.lock:
+            self.tokens = 1.0
+            self.updated = max(self.updated, self.clock() + seconds)
+
+
+def retry_after(value, default):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class FootballDataClient:
+    """GET JSON from football-data.org through one pooled, rate-limited session.
+
+    Responses are cached on disk with their validators; a repeat request
+    revalidates with If-None-Match / If-Modified-Since and reuses the cached
+    body on 304. `max_age` skips the network entirely for payloads that are
+    known not to change (e.g. a finished season).
+    """
+
+    def __init__(self, api_key=None, base_url=BASE_URL, cache_dir=CACHE_DIR,
+                 rate=RATE_LIMIT, per=RATE_PERIOD, timeout=10, retries=3, max_workers=5):
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.retries = retries
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, per)
+
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["X-Auth-Token"] = api_key
+        # No retries inside urllib3: get() retries through the token bucket
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, path, params=None, max_age=None):
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        key = self._cache_key(url, params)
+        cached = self._read_cache(key)
+        if cached is not None and max_age is not None and time.time() - cached["stored"] < max_age:
+            incr("fd_client.cache_fresh")
+            return cached["body"]
+
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            backoff = 2 ** attempt / self.bucket.fill_rate
+            with span("fd_client.rate_wait"):
+                self.bucket.acquire()
+            try:
+                with span("fd_client.request"):
+                    r = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                incr("fd_client.connection_errors")
+                self.bucket.pause(backoff)
+                continue
+            incr("fd_client.requests")
+            if r.status_code not in RETRY_STATUSES or attempt == self.retries:
+                break
+            incr("fd_client.throttled" if r.status_code == 429 else "fd_client.server_errors")
+            self.bucket.pause(retry_after(r.headers.get("Retry-After"), backoff))
+
+        if r.status_code == 304 and cached is not None:
+            incr("fd_client.not_modified")
+            self._write_cache(key, cached["body"], cached.get("etag"), cached.get("last_modified"))
+            return cached["body"]
+        r.raise_for_status()
+
+        body = r.json()
+        self._write_cache(key, body, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return body
+
+    def gather(self, *calls):
+        """Run independent zero-argument calls concurrently; results keep their order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return [f.result() for f in [pool.submit(call) for call in calls]]
+
+    def _cache_key(self, url, params):
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _read_cache(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_cache(self, key, body, etag, last_modified):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"stored": time.time(), "etag": etag,
+                       "last_modified": last_modified, "body": body}, f)
+        os.replace(tmp, path)
@@ -0,0 +1,201 @@
+# src/features.py
+# Vectorized team feature engine: home/away splits and recent form for every
+# team of every competition/season in one pass over the match frame.
+
+import numpy as np
+import pandas as pd
+
+# Optional columns that partition a match frame into separate tables
+GROUP_KEYS = ["competition", "season"]
+
+SPLIT_COLUMNS = ["home_wins", "home_draws", "home_losses",
+                 "away_wins", "away_draws", "away_losses"]
+
+
+def _keys(df):
+    return [k for k in GROUP_KEYS if k in df.columns]
+
+
+def team_results(matches: pd.DataFrame) -> pd.DataFrame:
+    """One row per team per finished match, from that team's point of view.
+
+    `result` is 1/0/-1 for a win/draw/loss; `is_home` marks home games.
+    """
+    keys = _keys(matches)
+    done = matches[matches["homeScore"].notna() & matches["awayScore"].notna()]
+
+    def side(team, opponent, gf, ga, is_home):
+        return pd.DataFrame({
+            **{k: done[k].to_numpy() for k in keys},
+            "utcDate": done["utcDate"].to_numpy(),
+            "team": done[team].to_numpy(),
+            "opponent": done[opponent].to_numpy(),
+            "result": np.sign(done[gf].to_numpy() - done[ga].to_numpy()).astype(np.int64),
+            "is_home": is_home,
+        })
+
+    long = pd.concat([
+        side("homeTeam", "awayTeam", "homeScore", "awayScore", True),
+        side("awayTeam", "homeTeam", "awayScore", "homeScore", False),
+    ], ignore_index=True)
+    return long.sort_values(keys + ["team", "utcDate"], kind="stable", ignore_index=True)
+
+
+def home_away_splits(matches: pd.DataFrame) -> pd.DataFrame:
+    """Home/away W/D/L counts per (competition, season, team)."""
+    long = team_results(matches)
+    keys = _keys(matches)
+    venue = np.where(long["is_home"], "home", "away")
+    outcome = long["result"].map({1: "wins", 0: "draws", -1: "losses"})
+    counts = (long.assign(split=venue + "_" + outcome)
+                  .groupby(keys + ["team", "split"]).size()
+                  .unstack("split"))
+    return counts.reindex(columns=SPLIT_COLUMNS).fillna(0).astype(np.int64)
+
+
+def recent_form(matches: pd.DataFrame, standings: pd.DataFrame, n: int = 5,
+                ratings=None) -> pd.DataFrame:
+    """Last-`n` form vector, form total and strength-weighted form per team.
+
+    Opponent strength is 0.5 * points + 0.5 * goal_diff from `standings`
+    (matched on competition/season when present), plus 5 when the opponent
+    was at home. With an `EloRatings` engine, it is instead the opponent's
+    rating above the starting rating as of that kickoff, plus the engine's
+    home advantage when the opponent was at home.
+    """
+    keys = _keys(matches)
+    last = team_results(matches).groupby(keys + ["team"], sort=False).tail(n)
+
+    if ratings is not None:
+        last = last.assign(opp_rating=ratings.rating_at(last["opponent"].tolist(), last["utcDate"]) - ratings.initial)
+        away_bonus = ratings.home_advantage
+    else:
+        strength = standings[keys + ["team"]].rename(columns={"team": "opponent"})
+        strength["opp_rating"] = 0.5 * standings["points"] + 0.5 * standings["goal_diff"]
+        last = last.merge(strength, on=keys + ["opponent"], how="left")
+        away_bonus = 5
+    last["weighted"] = last["result"] * (last["opp_rating"] + np.where(last["is_home"], 0, away_bonus))
+
+    grouped = last.groupby(keys + ["team"])
+    return pd.DataFrame({
+        "form_last_5": grouped["result"].apply(lambda s: s.tolist()),
+        "form_total": grouped["result"].sum(),
+        "strength_weighted_form": grouped["weighted"].sum(),
+    })
+
+
+def _is_finished(matches):
+    return matches["homeScore"].notna() & matches["awayScore"].notna()
+
+
+class IncrementalStats:
+    """Per-team accumulators for one season plus a match watermark.
+
+    Every match kicking off at or before `watermark` has been folded in;
+    finished matches after it (e.g. while an earlier one is still being
+    played) are remembered by id in `processed`. Form windows keep the last
+    `n` results with their opponent, so strength weighting can be redone
+    against the latest standings without replaying the season.
+    """
+
+    def __init__(self, season, splits, prev_splits, windows,
+                 watermark=None, processed=(), n=5):
+        self.season = season
+        self.splits = splits            # team -> [hw, hd, hl, aw, ad, al]
+        self.prev_splits = prev_splits  # team -> previous-season splits
+        self.windows = windows          # team -> [[utcDate, result, opponent, is_home], ...]
+        self.watermark = watermark
+        self.processed = set(processed)
+        self.n = n
+
+    @classmethod
+    def from_matches(cls, season, matches, prev_splits, n=5):
+        """Start from a full season frame (needs an `id` column)."""
+        splits = home_away_splits(matches)
+        last = team_results(matches).groupby("team", sort=False).tail(n)
+        windows = {}
+        for team, rows in last.groupby("team"):
+            windows[team] = [[d.isoformat(), int(r), o, bool(h)] for d, r, o, h in
+                             zip(rows["utcDate"], rows["result"], rows["opponent"], rows["is_home"])]
+        state = cls(season,
+                    {t: [int(v) for v in row] for t, row in splits.iterrows()},
+                    {t: [int(v) for v in row] for t, row in prev_splits.iterrows()},
+                    windows, n=n)
+        state._advance(matches)
+        return state
+
+    def fold(self, matches) -> int:
+        """Absorb finished matches not seen yet; returns how many were new."""
+        new = matches
+        if self.watermark is not None:
+            new = new[new["utcDate"] > pd.Timestamp(self.watermark)]
+        new = new[_is_finished(new) & ~new["id"].isin(self.processed)].sort_values("utcDate", kind="stable")
+
+        for m in new.itertuples(index=False):
+            hs, as_ = m.homeScore, m.awayScore
+            r = 1 if hs > as_ else (0 if hs == as_ else -1)
+            self._add(m.homeTeam, m.awayTeam, m.utcDate, r, True)
+            self._add(m.awayTeam, m.homeTeam, m.utcDate, -r, False)
+
+        self._advance(matches)
+        return len(new)
+
+    def _add(self, team, opponent, when, result, is_home):
+        split = self.splits.setdefault(team, [0] * 6)
+        split[(0 if is_home else 3) + (1 - result)] += 1  # win/draw/loss slot
+        window = self.windows.setdefault(team, [])
+        window.append([when.isoformat(), result, opponent, is_home])
+        window.sort(key=lambda e: pd.Timestamp(e[0]))
+        del window[:-self.n]
+
+    def _advance(self, matches):
+        """Move the watermark up to the last kickoff before any unfinished match."""
+        seen = matches
+        if self.watermark is not None:
+            seen = seen[seen["utcDate"] > pd.Timestamp(self.watermark)]
+        done = _is_finished(seen)
+        finished, pending = seen[done], seen[~done]
+        if len(pending):
+            finished_before = finished[finished["utcDate"] < pending["utcDate"].min()]
+        else:
+            finished_before = finished
+        if len(finished_before):
+            self.watermark = finished_before["utcDate"].max().isoformat()
+        if self.watermark is not None:
+            finished = finished[finished["utcDate"] > pd.Timestamp(self.watermark)]
+        self.processed = set(finished["id"].tolist())
+
+    def split_frame(self, previous=False) -> pd.DataFrame:
+        splits = self.prev_splits if previous else self.splits
+        return pd.DataFrame.from_dict(splits, orient="index", columns=SPLIT_COLUMNS)
+
+    def form_frame(self, standings: pd.DataFrame, ratings=None) -> pd.DataFrame:
+        """Same columns as `recent_form`, weighted against `standings` (or `ratings`)."""
+        if ratings is not None:
+            entries = [(e[2], e[0]) for window in self.windows.values() for e in window]
+            elo = ratings.rating_at([o for o, _ in entries], [d for _, d in entries]) - ratings.initial
+            rating = dict(zip(entries, elo))
+            away_bonus = ratings.home_advantage
+        else:
+            points = dict(zip(standings["team"], 0.5 * standings["points"] + 0.5 * standings["goal_diff"]))
+            rating = {(e[2], e[0]): points[e[2]] for window in self.windows.values()
+                      for e in window if e[2] in points}
+            away_bonus = 5
+        rows = {}
+        for team, window in self.windows.items():
+            results = [e[1] for e in window]
+            weighted = sum(e[1] * (rating[(e[2], e[0])] + (0 if e[3] else away_bonus))
+                           for e in window if (e[2], e[0]) in rating)
+            rows[team] = {"form_last_5": results, "form_total": sum(results),
+                          "strength_weighted_form": float(weighted)}
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    def to_dict(self) -> dict:
+        return {"season": self.season, "n": self.n, "watermark": self.watermark,
+                "processed": sorted(self.processed), "splits": self.splits,
+                "prev_splits": self.prev_splits, "windows": self.windows}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["season"], d["splits"], d["prev_splits"], d["windows"],
+                   d["watermark"], d["processed"], d["n"])
@@ -0,0 +1,122 @@
+# src/h2h.py
+# Head-to-head index over historical meetings
+
+import json
+import os
+from collections import deque
+
+import numpy as np
+
+from src.constants import H2H_PATH
+from src.snapshots import data_path
+
+H2H_FEATURES = ["h2h_played", "h2h_home_wins", "h2h_draws", "h2h_away_wins", "h2h_goal_diff"]
+
+
+def pair_key(team_a, team_b):
+    """Unordered pair key: the two names in sorted order."""
+    return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+
+class HeadToHead:
+    """Last `n` meetings and all-time W/D/L for every pair of teams that met.
+
+    Entries are keyed by `pair_key`; aggregates are stored from the first
+    (alphabetically smaller) team's side as [wins, draws, losses, goals_for,
+    goals_against] and flipped on lookup. `seen` holds every folded match id,
+    so re-folding overlapping pulls is harmless.
+    """
+
+    def __init__(self, meetings=None, totals=None, seen=(), n=5):
+        self.n = n
+        self.meetings = {k: deque(v, maxlen=n) for k, v in (meetings or {}).items()}
+        self.totals = totals or {}
+        self.seen = set(seen)
+
+    @classmethod
+    def from_matches(cls, matches, n=5):
+        index = cls(n=n)
+        index.fold(matches)
+        return index
+
+    def fold(self, matches) -> int:
+        """Add finished matches not seen yet (frames from `pull_matches`); returns how many."""
+        done = matches["homeScore"].notna() & matches["awayScore"].notna() & ~matches["id"].isin(self.seen)
+        new = matches[done].sort_values("utcDate", kind="stable")
+
+        for m in new.itertuples(index=False):
+            hs, as_ = int(m.homeScore), int(m.awayScore)
+            key = pair_key(m.homeTeam, m.awayTeam)
+            gf, ga = (hs, as_) if key[0] == m.homeTeam else (as_, hs)
+
+            total = self.totals.setdefault(key, [0, 0, 0, 0, 0])
+            total[0 if gf > ga else (1 if gf == ga else 2)] += 1
+            total[3] += gf
+            total[4] += ga
+
+            meetings = self.meetings.setdefault(key, deque(maxlen=self.n))
+            meeting = [m.utcDate.isoformat(), m.homeTeam, m.awayTeam, hs, as_]
+            if meetings and meeting[0] < meetings[-1][0]:
+                # Late-arriving older result: keep the window in date order
+                meetings = deque(sorted([*meetings, meeting]), maxlen=self.n)
+                self.meetings[key] = meetings
+            else:
+                meetings.append(meeting)
+            self.seen.add(int(m.id))
+        return len(new)
+
+    def lookup(self, team, opponent) -> dict:
+        """`team`'s record against `opponent` and their latest meetings (newest first)."""
+        key = pair_key(team, opponent)
+        wins, draws, losses, gf, ga = self.totals.get(key, [0, 0, 0, 0, 0])
+        if key[0] != team:
+            wins, losses, gf, ga = losses, wins, ga, gf
+        meetings = [{"date": d, "home_team": h, "away_team": a, "home_score": hs, "away_score": as_}
+                    for d, h, a, hs, as_ in reversed(self.meetings.get(key, ()))]
+        return {"played": wins + draws + losses, "wins": wins, "draws": draws, "losses": losses,
+                "goals_for": gf, "goals_against": ga, "meetings": meetings}
+
+    def features(self, pairs) -> np.ndarray:
+        """H2H_FEATURES for each (home, away) pair, from the home side; shape (len(pairs), 5)."""
+        out = np.zeros((len(pairs), len(H2H_FEATURES)))
+        for i, (home, away) in enumerate(pairs):
+            key = pair_key(home, away)
+            total = self.totals.get(key)
+            if total is None:
+                continue
+            wins, draws, losses, gf, ga = total
+            if key[0] != home:
+                wins, losses, gf, ga = losses, wins, ga, gf
+            out[i] = (wins + draws + losses, wins, draws, losses, gf - ga)
+        return out
+
+    def __len__(self):
+        return len(self.totals)
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "seen": sorted(self.seen),
+                "pairs": [[*key, self.totals[key], list(self.meetings.get(key, ()))]
+                          for key in sorted(self.totals)]}
+
+    @classmethod
+    def from_dict(cls, d):
+        meetings = {(a, b): m for a, b, _, m in d["pairs"]}
+        totals = {(a, b): t for a, b, t, _ in d["pairs"]}
+        return cls(meetings, totals, d["seen"], d["n"])
+
+
+def load_h2h(path=None):
+    """The saved index (default: in the current snapshot), or None if it hasn't been built yet."""
+    path = path or data_path(H2H_PATH)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return HeadToHead.from_dict(json.load(f))
+
+
+def save_h2h(index, path=None):
+    path = path or data_path(H2H_PATH)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index.to_dict(), f)
+    os.replace(tmp, path)
@@ -0,0 +1,71 @@
+# src/matchups.py
+# Vectorized home × away matchup builder for training data
+
+import numpy as np
+import pandas as pd
+
+from src.constants import TEAM_STAT_COLUMNS, FEATURE_COLUMNS
+
+
+def _group_members(df, group_cols):
+    """Row ids per group (one group holding every row when `group_cols` is empty)."""
+    if not group_cols:
+        return [np.arange(len(df))]
+    codes, _ = pd.factorize(pd.MultiIndex.from_frame(df[list(group_cols)]))
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return np.split(order, bounds)
+
+
+def _pair_ids(members, start, stop):
+    """Home/away row ids for pair numbers [start, stop) of one group.
+
+    Pair k is home = k // (n-1) and the (k % (n-1))-th other team, which
+    reproduces the `for home: for away: if home != away` ordering.
+    """
+    n = len(members)
+    k = np.arange(start, stop)
+    home = k // (n - 1)
+    away = k % (n - 1)
+    away = away + (away >= home)
+    return members[home], members[away]
+
+
+def label_results(home_points, away_points):
+    """Proxy target: the side with more points wins, equal points is a draw."""
+    return np.select([home_points > away_points, away_points > home_points],
+                     ["HomeWin", "AwayWin"], "Draw")
+
+
+def iter_matchups(df: pd.DataFrame, group_cols=(), chunk_size=100_000):
+    """Yield matchup frames of at most `chunk_size` rows.
+
+    Every ordered pair of distinct teams within the same group (e.g.
+    competition and season) becomes one row with both sides' features and a
+    `result` label; no per-pair Python objects are created.
+    """
+    teams = df["team"].to_numpy()
+    stats = {stat: df[stat].to_numpy() for stat in TEAM_STAT_COLUMNS}
+    sides = list(zip(TEAM_STAT_COLUMNS, FEATURE_COLUMNS[::2], FEATURE_COLUMNS[1::2]))
+
+    for members in _group_members(df, group_cols):
+        n_pairs = len(members) * (len(members) - 1)
+        for start in range(0, n_pairs, chunk_size):
+            home, away = _pair_ids(members, start, min(start + chunk_size, n_pairs))
+            columns = {col: df[col].to_numpy()[home] for col in group_cols}
+            columns["home_team"] = teams[home]
+            columns["away_team"] = teams[away]
+            for stat, home_col, away_col in sides:
+                columns[home_col] = stats[stat][home]
+                columns[away_col] = stats[stat][away]
+            chunk = pd.DataFrame(columns)
+            chunk["result"] = label_results(columns["home_points"], columns["away_points"])
+            yield chunk
+
+
+def build_matchups(df: pd.DataFrame, group_cols=(), chunk_size=100_000) -> pd.DataFrame:
+    """All matchups as one frame (see `iter_matchups`)."""
+    chunks = list(iter_matchups(df, group_cols, chunk_size))
+    if not chunks:
+        return pd.DataFrame(columns=list(group_cols) + ["home_team", "away_team"] + FEATURE_COLUMNS + ["result"])
+    return pd.concat(chunks, ignore_index=True)
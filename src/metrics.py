@@ -0,0 +1,193 @@
+# src/metrics.py
+# In-process timing spans and counters
+#
+# Off unless FOOTY_METRICS=1 (or enable() is called). When off, `span` hands
+# back a shared no-op context manager and `timed` functions call straight
+# through, so instrumented code pays one flag check.
+#
+#   with span("build.assemble"): ...
+#   @timed("predictor.load_model")
+#   incr("fd_client.cache_hit")
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+METRICS_ENV = "FOOTY_METRICS"
+METRICS_LOG = os.getenv("FOOTY_METRICS_LOG", "reports/metrics.jsonl")
+SAMPLES = 1024            # recent durations kept per span for percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+
+_enabled = os.getenv(METRICS_ENV, "").lower() in ("1", "true", "yes")
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=SAMPLES)
+
+
+def observe(name, seconds):
+    with _lock:
+        series = _spans.get(name)
+        if series is None:
+            series = _spans[name] = _Series()
+        series.count += 1
+        series.total += seconds
+        series.max = max(series.max, seconds)
+        series.recent.append(seconds)
+
+
+def incr(name, value=1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    """Context manager timing its block under `name`."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name):
+    """Decorator timing every call of the function under `name`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+# -----------------------------
+# Export
+# -----------------------------
+def _quantile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def snapshot() -> dict:
+    """{"spans": {name: count/total/max/p50/p95/p99 in seconds}, "counters": {...}}."""
+    with _lock:
+        spans = {name: (s.count, s.total, s.max, sorted(s.recent)) for name, s in _spans.items()}
+        counters = dict(_counters)
+    out = {}
+    for name, (count, total, peak, ordered) in sorted(spans.items()):
+        out[name] = {"count": count, "total": total, "max": peak,
+                     **{f"p{int(q * 100)}": _quantile(ordered, q) for q in QUANTILES}}
+    return {"spans": out, "counters": dict(sorted(counters.items()))}
+
+
+def _metric_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def prometheus_text(prefix="footy") -> str:
+    """Prometheus text exposition: one summary per span, one counter per counter."""
+    snap = snapshot()
+    lines = []
+    if snap["spans"]:
+        lines += [f"# HELP {prefix}_span_seconds Duration of instrumented spans.",
+                  f"# TYPE {prefix}_span_seconds summary"]
+        for name, s in snap["spans"].items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_span_seconds{{span="{name}",quantile="{q}"}} '
+                             f'{s[f"p{int(q * 100)}"]:.6f}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {s["total"]:.6f}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {s["count"]}')
+    for name, value in snap["counters"].items():
+        metric = f"{prefix}_{_metric_name(name)}_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """Write the exposition atomically (e.g. for node_exporter's textfile collector)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def _jsonl_logger(path, max_bytes, backups):
+    logger = logging.getLogger(f"footy.metrics.{path}")
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        logger.addHandler(RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def dump_jsonl(path=METRICS_LOG, source=None, max_bytes=5 * 1024 * 1024, backups=3):
+    """Append the current snapshot as one line to a size-rotated JSONL file."""
+    if not _enabled:
+        return
+    record = {"ts": time.time(), "pid": os.getpid(), "source": source, **snapshot()}
+    _jsonl_logger(path, max_bytes, backups).info(json.dumps(record))
@@ -0,0 +1,200 @@
+# src/prediction_log.py
+# Non-blocking prediction log
+#
+# `record()` only puts a dict on a bounded queue; a daemon thread drains it
+# and appends batches to JSONL files under data/predictions/<YYYY-MM-DD>/,
+# starting a new file each UTC day or once a file reaches MAX_FILE_BYTES.
+# When the queue is full the record is dropped and counted, never waited on.
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+from src import metrics
+
+LOG_DIR = "data/predictions"
+MAX_QUEUE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 2.0      # seconds a record may wait before being written
+MAX_FILE_BYTES = 16 * 1024 * 1024
+
+
+class PredictionLog:
+    def __init__(self, directory=LOG_DIR, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_bytes=MAX_FILE_BYTES):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.written = 0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._path = None
+        self._day = None
+        self._part = 0
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def record(self, home_team, away_team, probs, model_version=None, data_version=None,
+               latency=None, source=None, competition=None):
+        """Queue one prediction; returns False if it had to be dropped."""
+        entry = {
+            "ts": time.time(),
+            "home_team": home_team,
+            "away_team": away_team,
+            "probs": [round(float(p), 6) for p in probs],
+            "model_version": model_version,
+            "data_version": data_version,
+            "latency_ms": None if latency is None else round(latency * 1000, 3),
+            "source": source,
+            "competition": competition,
+        }
+        if self._thread is None:
+            self._start()
+        try:
+            self.queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.incr("prediction_log.dropped")
+            return False
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk (or `timeout` passes)."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self.queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    # -----------------------------
+    # Writer thread
+    # -----------------------------
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 5.0)
+
+    def _run(self):
+        while True:
+            batch, markers = [], []
+            item = self.queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break  # flush requested: write what we have now
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.set()
+
+    def _target(self, size):
+        """Current file, rolling over on a new UTC day or when it would grow past max_bytes."""
+        day = time.strftime("%Y-%m-%d", time.gmtime())
+        if day != self._day:
+            self._day, self._part, self._path = day, 0, None
+        if self._path is not None and os.path.exists(self._path) \
+                and os.path.getsize(self._path) + size > self.max_bytes:
+            self._part += 1
+            self._path = None
+        if self._path is None:
+            folder = os.path.join(self.directory, day)
+            os.makedirs(folder, exist_ok=True)
+            self._path = os.path.join(folder, f"predictions-{os.getpid()}-{self._part:04d}.jsonl")
+        return self._path
+
+    def _write(self, batch):
+        data = "".join(json.dumps(entry) + "\n" for entry in batch).encode()
+        try:
+            with open(self._target(len(data)), "ab") as f:
+                f.write(data)
+        except OSError:
+            self.dropped += len(batch)
+            metrics.incr("prediction_log.dropped", len(batch))
+            return
+        self.written += len(batch)
+        metrics.incr("prediction_log.written", len(batch))
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_prediction_log() -> PredictionLog:
+    """Process-wide log; its writer thread starts on the first record."""
+    global _log
+    with _log_lock:
+        if _log is None:
+            _log = PredictionLog()
+        return _log
+
+
+def log_prediction(home_team, away_team, probs, **kwargs):
+    return get_prediction_log().record(home_team, away_team, probs, **kwargs)
+
+
+# -----------------------------
+# Reader
+# -----------------------------
+def read_log(day=None, directory=LOG_DIR):
+    """One UTC day's predictions (default: today) as a DataFrame.
+
+    `probs` is expanded into home_win / draw / away_win and `ts` becomes a
+    UTC timestamp. Lines that don't parse (a batch still being written, or
+    cut short by a crash) are skipped; their count is in `df.attrs["unreadable"]`.
+    """
+    import pandas as pd
+
+    day = day or time.strftime("%Y-%m-%d", time.gmtime())
+    if not isinstance(day, str):
+        day = pd.Timestamp(day).strftime("%Y-%m-%d")
+
+    rows, unreadable = [], 0
+    for path in sorted(glob.glob(os.path.join(directory, day, "*.jsonl"))):
+        with open(path, "r", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                if isinstance(row, dict) and "ts" in row and "probs" in row:
+                    rows.append(row)
+                else:
+                    unreadable += 1
+    if unreadable:
+        metrics.incr("prediction_log.unreadable", unreadable)
+
+    columns = ["ts", "competition", "home_team", "away_team", "home_win", "draw", "away_win",
+               "model_version", "data_version", "latency_ms", "source"]
+    if not rows:
+        df = pd.DataFrame(columns=columns)
+    else:
+        df = pd.DataFrame(rows)
+        df[["home_win", "draw", "away_win"]] = pd.DataFrame(df.pop("probs").tolist(), index=df.index)
+        df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+        # Entries written before `competition` was logged read back as missing
+        df = df.sort_values("ts", ignore_index=True).reindex(columns=columns)
+    df.attrs["unreadable"] = unreadable
+    return df
@@ -1,63 +1,417 @@
 # src/predictor.py
 
-import joblib
 import numpy as np
-import pandas as pd
+import hashlib
 import json
-from src.constants import MODEL_PATH, LABEL_ENCODER_PATH
+import os
+from src.constants import (
+    FLAT_MODEL_PATH, LINEAR_MODEL_PATH,
+    TEAM_STAT_COLUMNS, FEATURE_COLUMNS, OUTCOME_LABELS,
+)
+from src.competitions import LRUCache, competition_code, partition
+from src.data_loader import load_team_table
+from src.metrics import timed
+from src.store import manifest_path, read_array_dir, read_manifest, resolve_array_dir, write_array_dir
+from src.team_table import as_team_table
 
 
-def load_model():
-    """Load trained model, label encoder, and class order."""
-    model = joblib.load(MODEL_PATH)
-    le = joblib.load(LABEL_ENCODER_PATH)
+def model_sources(competition=None):
+    """Files that make up a competition's trained model."""
+    p = partition(competition)
+    return [p.model, manifest_path(p.flat_model), manifest_path(p.linear_model), p.classes]
+
+
+def matchup_sources(competition=None):
+    """Files a competition's matchup table depends on; rewriting any of them invalidates it."""
+    p = partition(competition)
+    return model_sources(competition) + [manifest_path(p.stats), f"{p.stats}.csv"]
+
+
+# Serving backend: "forest" (default) or "linear"; see load_model
+BACKEND_ENV = "FOOTY_MODEL_BACKEND"
+DEFAULT_BACKEND = "forest"
+
+# Node arrays of the flat artifact, one memory-mappable .npy file each
+FOREST_ARRAYS = ["feature", "threshold", "children", "value", "roots", "tree_depth"]
+
+
+class FlatForest:
+    """A RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees share one node table. `children` interleaves each node's
+    left and right child (leaves point at themselves), `feature` is the
+    split column as an int64 offset into a row, and `roots` lists the
+    trees deepest first, with `tree_depth` alongside. Scoring steps a
+    (tree, row) node matrix one level at a time; level `d` only touches
+    the leading trees that still split there. Everything scoring reads is
+    built at export, so a memory-mapped artifact is used as is.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, tree_depth, depth, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value  # per-node class distribution, rows sum to 1
+        self.roots = roots
+        self.tree_depth = tree_depth
+        self.depth = int(depth)
+        self.classes_ = classes
+        # Number of trees still splitting at each level
+        self.active = [int(np.searchsorted(-tree_depth, -d, side="left")) for d in range(self.depth)]
+
+    @classmethod
+    def from_node_arrays(cls, feature, threshold, left, right, value, roots, depth, classes):
+        """Build from per-node left/right child arrays with `roots` in node order."""
+        roots = np.asarray(roots, dtype=np.int64)
+        node_depth = np.zeros(len(left), dtype=np.int64)
+        frontier = roots
+        while frontier.size:
+            parents = np.concatenate([frontier, frontier])
+            kids = np.concatenate([left[frontier], right[frontier]])
+            split = kids != parents
+            kids = kids[split]
+            node_depth[kids] = node_depth[parents[split]] + 1
+            frontier = kids
+        tree_depth = np.maximum.reduceat(node_depth, roots)
+        order = np.argsort(-tree_depth, kind="stable")
+        return cls(feature=np.asarray(feature, dtype=np.int64),
+                   threshold=np.asarray(threshold, dtype=np.float64),
+                   children=np.stack([left, right], axis=1).ravel().astype(np.int64),
+                   value=np.asarray(value, dtype=np.float64),
+                   roots=roots[order], tree_depth=tree_depth[order], depth=depth, classes=classes)
+
+    def predict_proba(self, X):
+        # sklearn evaluates splits on float32 inputs; match it exactly
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) > 1:
+            # Duplicate rows (e.g. the same fixture in many requests) are scored once
+            X, inverse = np.unique(X, axis=0, return_inverse=True)
+            return self._score(X.astype(np.float64))[inverse.ravel()]
+        return self._score(X.astype(np.float64))
+
+    def _score(self, X):
+        n, n_features = X.shape
+        x = X.ravel()
+        row_start = np.arange(n) * n_features
+        node = np.repeat(self.roots, n).reshape(len(self.roots), n)
+        for k in self.active:
+            cur = node[:k]
+            go_right = x[self.feature[cur] + row_start] > self.threshold[cur]
+            node[:k] = self.children[2 * cur + go_right]
+        return self.value[node].mean(axis=0)
+
+
+def flatten_forest(model):
+    """Pack a fitted RandomForestClassifier into a FlatForest."""
+    trees = [est.tree_ for est in model.estimators_]
+    counts = np.array([t.node_count for t in trees])
+    roots = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for root, t in zip(roots, trees):
+        ids = np.arange(t.node_count) + root
+        leaf = t.children_left == -1
+        feature.append(np.where(leaf, 0, t.feature))
+        threshold.append(np.where(leaf, 0.0, t.threshold))
+        left.append(np.where(leaf, ids, t.children_left + root))
+        right.append(np.where(leaf, ids, t.children_right + root))
+        dist = t.value[:, 0, :].astype(np.float64)
+        totals = dist.sum(axis=1, keepdims=True)
+        value.append(dist / np.where(totals == 0, 1, totals))
+
+    return FlatForest.from_node_arrays(
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left).astype(np.int64),
+        right=np.concatenate(right).astype(np.int64),
+        value=np.concatenate(value),
+        roots=roots,
+        depth=max(t.max_depth for t in trees),
+        classes=np.asarray(model.classes_),
+    )
+
+
+def save_flat_forest(forest, path=FLAT_MODEL_PATH):
+    """Write the forest as a directory of .npy node arrays plus schema.json."""
+    arrays = {name: np.ascontiguousarray(getattr(forest, name)) for name in FOREST_ARRAYS}
+    manifest = {"format": "flat_forest", "depth": forest.depth,
+                "classes": np.asarray(forest.classes_).tolist(),
+                "arrays": {name: {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+                           for name, arr in arrays.items()}}
+    write_array_dir(path, arrays, manifest)
+
+
+def load_flat_forest(path=FLAT_MODEL_PATH, mmap=True):
+    """Attach to a saved forest.
+
+    Node arrays are memory-mapped read-only, so every process on a host
+    shares the page cache's single copy instead of holding its own. Older
+    artifacts (`.npz`, or left/right child arrays) are still read, into
+    private memory.
+    """
+    if path.endswith(".npz"):
+        with np.load(path) as arrays:
+            return FlatForest.from_node_arrays(**{k: arrays[k] for k in arrays.files})
+    path = resolve_array_dir(path)
+    manifest = read_manifest(path)
+    classes = np.asarray(manifest["classes"])
+    if "children" not in manifest["arrays"]:
+        arrays = read_array_dir(path, ["feature", "threshold", "left", "right", "value", "roots"], mmap=False)
+        return FlatForest.from_node_arrays(**arrays, depth=manifest["depth"], classes=classes)
+    arrays = read_array_dir(path, FOREST_ARRAYS, mmap)
+    return FlatForest(**arrays, depth=manifest["depth"], classes=classes)
+
+
+# -----------------------------
+# Linear backend
+# -----------------------------
+class LinearModel:
+    """Multinomial logistic regression evaluated with one matmul and a softmax.
+
+    Feature standardization is folded into `coef` and `intercept` at export,
+    so scoring is `softmax(X @ coef.T + intercept)` on raw feature rows.
+    """
+
+    def __init__(self, coef, intercept, classes):
+        self.coef = coef            # (n_classes, n_features)
+        self.intercept = intercept  # (n_classes,)
+        self.classes_ = classes
+
+    def predict_proba(self, X):
+        z = np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept
+        z -= z.max(axis=1, keepdims=True)
+        np.exp(z, out=z)
+        z /= z.sum(axis=1, keepdims=True)
+        return z
+
+
+def linear_from_sklearn(model, scaler=None):
+    """LinearModel from a fitted LogisticRegression (and the StandardScaler before it)."""
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    if scaler is not None:
+        coef = coef / scaler.scale_
+        intercept = intercept - coef @ scaler.mean_
+    return LinearModel(coef, intercept, np.asarray(model.classes_))
+
+
+def save_linear_model(model, path=LINEAR_MODEL_PATH):
+    arrays = {"coef": np.ascontiguousarray(model.coef), "intercept": np.ascontiguousarray(model.intercept)}
+    write_array_dir(path, arrays, {"format": "linear", "classes": np.asarray(model.classes_).tolist(),
+                                   "features": FEATURE_COLUMNS})
+
+
+def load_linear_model(path=LINEAR_MODEL_PATH):
+    path = resolve_array_dir(path)
+    manifest = read_manifest(path)
+    arrays = read_array_dir(path, ["coef", "intercept"], mmap=False)
+    return LinearModel(arrays["coef"], arrays["intercept"], np.asarray(manifest["classes"]))
+
+
+# Models scored on plain feature arrays (no sklearn at serve time)
+ARRAY_MODELS = (FlatForest, LinearModel)
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+def _flat_artifact(path=FLAT_MODEL_PATH):
+    """Path of the flat forest to serve, preferring the mappable layout."""
+    if os.path.exists(manifest_path(path)):
+        return path
+    if os.path.exists(f"{path}.npz"):
+        return f"{path}.npz"
+    return None
+
+
+def _load_forest(p):
+    flat = _flat_artifact(p.flat_model)
+    if flat is not None:
+        return load_flat_forest(flat), None
+    import joblib
+    model = joblib.load(p.model)
+    # Models saved before train_team_model reset it still carry n_jobs=-1
+    model.set_params(n_jobs=None)
+    return model, joblib.load(p.label_encoder)
+
+
+def _load_linear(p):
+    if not os.path.exists(manifest_path(p.linear_model)):
+        raise FileNotFoundError(f"No linear model at {p.linear_model}; run scripts/train_team_model.py")
+    return load_linear_model(p.linear_model), None
+
+
+BACKENDS = {"forest": _load_forest, "linear": _load_linear}
+
+
+def model_backend(backend=None) -> str:
+    """Backend to serve: `backend`, else $FOOTY_MODEL_BACKEND, else "forest"."""
+    backend = backend or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}; choose from {sorted(BACKENDS)}")
+    return backend
+
+
+@timed("predictor.load_model")
+def load_model(backend=None, competition=None):
+    """Load trained model, label encoder, and class order for a competition.
+
+    The "forest" backend serves the flat forest artifact when it exists,
+    which avoids unpickling sklearn objects entirely; "linear" serves the
+    NumPy logistic model. `le` is None unless the sklearn forest was loaded.
+    """
+    p = partition(competition)
+    model, le = BACKENDS[model_backend(backend)](p)
 
     # ✅ Load class order (saved during training)
     try:
-        with open("model_classes.json", "r") as f:
+        with open(p.classes, "r") as f:
             class_order = json.load(f)
     except FileNotFoundError:
-        print("⚠️ model_classes.json not found — using default class order.")
+        if le is None:
+            import joblib
+            le = joblib.load(p.label_encoder)
+        print(f"⚠️ {p.classes} not found — using default class order.")
         class_order = list(le.classes_)
 
     return model, le, class_order
 
 
-def predict_match(model, le, class_order, df, home_team, away_team):
-    """Predict match outcome and return probabilities + label."""
-    home = df[df["team"] == home_team].iloc[0]
-    away = df[df["team"] == away_team].iloc[0]
+def team_feature_matrix(df):
+    """Team table for `df` plus its model stats as one float matrix, by team id."""
+    table = as_team_table(df)
+    return table, table.gather(np.arange(len(table)), TEAM_STAT_COLUMNS)
+
+
+@timed("predictor.predict_matches")
+def predict_matches(model, le, class_order, df, pairs, features=None):
+    """Score many (home, away) pairs with a single predict_proba call.
 
-    # ✅ Make sure feature order matches the training
-    feature_data = {
-        "home_points": [home["points"]],
-        "away_points": [away["points"]],
-        "home_goal_diff": [home["goal_diff"]],
-        "away_goal_diff": [away["goal_diff"]],
-        "home_form": [home["form_total"]],
-        "away_form": [away["form_total"]],
-        "home_weighted_form": [home["strength_weighted_form"]],
-        "away_weighted_form": [away["strength_weighted_form"]],
-    }
+    `df` may be a DataFrame or a TeamTable. Returns an array of shape
+    (len(pairs), 3) with HomeWin/Draw/AwayWin probabilities, aligned with
+    `pairs`. Pass `features` (the result of `team_feature_matrix(df)`) to
+    reuse it across calls.
+    """
+    table, matrix = features if features is not None else team_feature_matrix(df)
 
-    X_new = pd.DataFrame(feature_data)
+    ids = table.ids([team for pair in pairs for team in pair]).reshape(-1, 2)
+    if len(ids) == 0:
+        return np.empty((0, len(OUTCOME_LABELS)))
 
-    # Predict probabilities
-    probs = model.predict_proba(X_new)[0]
+    # Gather both sides at once and interleave them into training order
+    home, away = matrix[ids[:, 0]], matrix[ids[:, 1]]
+    X = np.stack([home, away], axis=2).reshape(len(ids), -1)
+    if isinstance(model, ARRAY_MODELS):
+        probs = model.predict_proba(X)
+    else:
+        import pandas as pd
+        probs = model.predict_proba(pd.DataFrame(X, columns=FEATURE_COLUMNS))
 
-    # Map probabilities to correct class order
-    prob_map = dict(zip(class_order, probs))
+    # Reorder model classes to HomeWin / Draw / AwayWin
+    ordered = np.zeros((len(ids), len(OUTCOME_LABELS)))
+    for j, lbl in enumerate(OUTCOME_LABELS):
+        if lbl in class_order:
+            ordered[:, j] = probs[:, class_order.index(lbl)]
+    return ordered
 
-    # ✅ Reorder to football-friendly logic
-    ordered_labels = ["HomeWin", "Draw", "AwayWin"]
-    ordered_probs = [prob_map.get(lbl, 0) for lbl in ordered_labels]
+
+@timed("predictor.predict_match")
+def predict_match(model, le, class_order, df, home_team, away_team):
+    """Predict match outcome and return probabilities + label."""
+    table = as_team_table(df)
+    home = table.row(home_team)
+    away = table.row(away_team)
+
+    ordered_probs = list(predict_matches(model, le, class_order, table, [(home_team, away_team)])[0])
 
     # Get final label based on highest probability
-    label = ordered_labels[np.argmax(ordered_probs)]
+    label = OUTCOME_LABELS[np.argmax(ordered_probs)]
 
     return ordered_probs, label, home, away
 
 
+def artifact_signature(paths=None):
+    """(path, mtime_ns, size) per file — changes whenever one is rewritten.
+
+    Defaults to the default competition's matchup sources.
+    """
+    signature = []
+    for path in paths or matchup_sources():
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def signature_digest(signature) -> str:
+    """Short stable id for an artifact signature (e.g. a model version)."""
+    return hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+
+
+def model_version(backend=None, competition=None) -> str:
+    digest = signature_digest(artifact_signature(model_sources(competition)))
+    return f"{model_backend(backend)}-{digest}"
+
+
+class MatchupTable:
+    """Precomputed HomeWin/Draw/AwayWin probabilities for every home × away pair."""
+
+    def __init__(self, teams, probs, signature=None, backend=None, competition=None):
+        self.teams = list(teams)
+        self.index = {team: i for i, team in enumerate(self.teams)}
+        self.probs = probs  # shape (n_teams, n_teams, 3)
+        self.signature = signature
+        self.competition = competition_code(competition)
+        sources = model_sources(self.competition)
+        model_files = tuple(s for s in signature or () if s[0] in sources)
+        self.model_version = (f"{model_backend(backend)}-{signature_digest(model_files)}"
+                              if model_files else None)
+
+    def lookup(self, home_team, away_team):
+        """Return (ordered_probs, label) for one fixture as an array read."""
+        probs = self.probs[self.index[home_team], self.index[away_team]]
+        return list(probs), OUTCOME_LABELS[int(np.argmax(probs))]
+
+    def is_stale(self):
+        return (self.signature is not None
+                and self.signature != artifact_signature(matchup_sources(self.competition)))
+
+
+@timed("predictor.build_matchup_table")
+def build_matchup_table(model, le, class_order, df, signature=None, backend=None, competition=None):
+    """Score all home/away combinations of the teams in `df` in one batch."""
+    features = team_feature_matrix(df)
+    teams = features[0].teams
+    pairs = [(home, away) for home in teams for away in teams]
+    probs = predict_matches(model, le, class_order, df, pairs, features=features)
+    return MatchupTable(teams, probs.reshape(len(teams), len(teams), -1), signature, backend, competition)
+
+
+def _build_matchups(key):
+    competition, backend = key
+    signature = artifact_signature(matchup_sources(competition))
+    model, le, class_order = load_model(backend, competition)
+    return build_matchup_table(model, le, class_order, load_team_table(competition),
+                               signature, backend, competition)
+
+
+# One table per (competition, backend); the least recently used is dropped
+_matchup_tables = LRUCache(_build_matchups, name="predictor.matchup_cache")
+
+
+def get_matchup_table(competition=None, backend=None):
+    """Shared matchup table for a competition.
+
+    Loaded on first use, rebuilt when the competition's model or team stats
+    files change, and evicted when COMPETITION_CACHE_SIZE others are newer.
+    """
+    key = (competition_code(competition), model_backend(backend))
+    return _matchup_tables.get(key, stale=MatchupTable.is_stale)
+
+
+@timed("predictor.generate_insights")
 def generate_insights(home, away, home_team, away_team):
     """Generate brief match insights based on stats."""
     insights = []
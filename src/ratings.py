@@ -0,0 +1,307 @@
+# src/ratings.py
+# Streaming Elo ratings with home advantage
+
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.constants import RATINGS_PATH
+from src.snapshots import data_path
+
+# Folded results kept for replays, one list per column
+HISTORY_COLUMNS = ["id", "utcDate", "homeTeam", "awayTeam", "homeScore", "awayScore", "season"]
+
+
+def _ns(values) -> np.ndarray:
+    """Kickoff times as int64 UTC nanoseconds (naive times are taken as UTC)."""
+    ts = pd.to_datetime(pd.Series(list(values) if not isinstance(values, pd.Series) else values), utc=True)
+    return ts.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _ns_one(when) -> int:
+    ts = pd.Timestamp(when)
+    return (ts.tz_convert(None) if ts.tzinfo is not None else ts).as_unit("ns").value
+
+
+class EloRatings:
+    """Elo ratings for every team seen, kept in one dense float array.
+
+    Matches are folded in kickoff order, once each (by id). Every rating
+    change is appended to a log of (kickoff, team id, rating after), which
+    is what `snapshot` and `rating_at` read to answer "as of" questions.
+    A result kicking off before the latest one folded (a late result, or
+    an older season folded after a newer one) replays every folded result
+    in kickoff order, so the log never holds changes computed out of order.
+
+    `fold` groups a match frame into levels in which no team plays twice;
+    each level is one vectorized update, so many leagues and seasons go
+    through in roughly as many steps as there are rounds. `update` handles
+    a single result in O(1).
+    """
+
+    def __init__(self, k=20.0, home_advantage=60.0, initial=1500.0, season_regression=0.25):
+        self.k = k
+        self.home_advantage = home_advantage
+        self.initial = initial
+        self.season_regression = season_regression  # pull toward `initial` at a team's first match of a new season
+        self.index = {}
+        self.teams = []
+        self.ratings = np.empty(0)
+        self.last_season = np.empty(0, dtype=object)
+        self.seen = set()
+        self.latest = None  # kickoff (ns) of the latest result folded
+        self.history = {col: [] for col in HISTORY_COLUMNS}
+        self.replayable = True  # False when loaded from a file saved without history
+        self._log_time, self._log_team, self._log_rating = [], [], []
+
+    def _reset(self):
+        """Forget every team, rating and log entry (parameters are kept)."""
+        self.__init__(self.k, self.home_advantage, self.initial, self.season_regression)
+
+    # -----------------------------
+    # Teams
+    # -----------------------------
+    def _ids(self, names):
+        """Dense ids for `names`, registering new teams at the initial rating."""
+        new = [n for n in dict.fromkeys(names) if n not in self.index]
+        if new:
+            for name in new:
+                self.index[name] = len(self.teams)
+                self.teams.append(name)
+            self.ratings = np.concatenate([self.ratings, np.full(len(new), self.initial)])
+            self.last_season = np.concatenate([self.last_season, np.full(len(new), None, dtype=object)])
+        return np.fromiter((self.index[n] for n in names), dtype=np.int64, count=len(names))
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __getitem__(self, team):
+        i = self.index.get(team)
+        return self.initial if i is None else float(self.ratings[i])
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def expected(self, home_rating, away_rating):
+        """Expected home score (win = 1, draw = 0.5)."""
+        return 1.0 / (1.0 + 10.0 ** ((away_rating - home_rating - self.home_advantage) / 400.0))
+
+    def _apply(self, home, away, home_goals, away_goals, when, season=None):
+        """Vectorized update for matches in which no team appears twice."""
+        if season is not None and self.season_regression:
+            for ids in (home, away):
+                changed = np.array([s is not None and s != last for s, last in
+                                    zip(season, self.last_season[ids])], dtype=bool)
+                if changed.any():
+                    r = self.ratings[ids[changed]]
+                    self.ratings[ids[changed]] = self.initial + (1 - self.season_regression) * (r - self.initial)
+                known = np.array([s is not None for s in season], dtype=bool)
+                self.last_season[ids[known]] = season[known]
+
+        score = np.where(home_goals > away_goals, 1.0, np.where(home_goals == away_goals, 0.5, 0.0))
+        # Goal-difference multiplier: bigger wins move ratings more
+        margin = np.log1p(np.abs(home_goals - away_goals)) + 1.0
+        delta = self.k * margin * (score - self.expected(self.ratings[home], self.ratings[away]))
+        self.ratings[home] += delta
+        self.ratings[away] -= delta
+
+        self._log_time += [when, when]
+        self._log_team += [home, away]
+        self._log_rating += [self.ratings[home].copy(), self.ratings[away].copy()]
+
+    def update(self, home_team, away_team, home_goals, away_goals, when, match_id=None, season=None):
+        """Fold one result; returns False if `match_id` was already folded.
+
+        O(1), unless the result kicked off before the latest one folded.
+        """
+        if match_id is not None:
+            if match_id in self.seen:
+                return False
+            self.seen.add(match_id)
+        when = _ns_one(when)
+        record = dict(zip(HISTORY_COLUMNS, [match_id, when, home_team, away_team,
+                                            int(home_goals), int(away_goals), season]))
+        if self._out_of_order(when):
+            self._replay(pd.DataFrame([record]))
+            return True
+        ids = self._ids([home_team, away_team])
+        self._apply(ids[:1], ids[1:], np.array([home_goals]), np.array([away_goals]),
+                    np.array([when], dtype=np.int64), np.array([season], dtype=object))
+        self._remember(record)
+        return True
+
+    def fold(self, matches: pd.DataFrame) -> int:
+        """Fold finished, unseen matches from a `pull_matches` frame; returns how many."""
+        done = matches["homeScore"].notna() & matches["awayScore"].notna() & ~matches["id"].isin(self.seen)
+        new = matches[done]
+        if new.empty:
+            return 0
+        new = pd.DataFrame({
+            "id": new["id"].to_numpy(),
+            "utcDate": _ns(new["utcDate"]),
+            "homeTeam": new["homeTeam"].to_numpy(),
+            "awayTeam": new["awayTeam"].to_numpy(),
+            "homeScore": new["homeScore"].to_numpy(dtype=np.int64),
+            "awayScore": new["awayScore"].to_numpy(dtype=np.int64),
+            "season": new["season"].to_numpy(dtype=object) if "season" in new else None,
+        })
+        if self._out_of_order(new["utcDate"].min()):
+            self._replay(new)
+        else:
+            self._fold_sorted(new)
+        return len(new)
+
+    def _out_of_order(self, when) -> bool:
+        if self.latest is None or when >= self.latest:
+            return False
+        if not self.replayable:
+            warnings.warn("Folding a result older than the latest one without the history to replay; "
+                          "ratings after it are approximate until a full rebuild", RuntimeWarning)
+            return False
+        return True
+
+    def _replay(self, new):
+        """Start over and fold every result seen so far plus `new`, in kickoff order."""
+        folded = pd.DataFrame(self.history)
+        self._reset()
+        self._fold_sorted(pd.concat([folded, new], ignore_index=True) if len(folded) else new)
+
+    def _fold_sorted(self, new):
+        """Fold a frame of HISTORY_COLUMNS (kickoffs in ns) in kickoff order, level by level."""
+        new = new.sort_values("utcDate", kind="stable")
+        home = self._ids(new["homeTeam"].tolist())
+        away = self._ids(new["awayTeam"].tolist())
+
+        # Level of a match = 1 + the latest level either team has played in,
+        # so each team's matches stay in order and appear once per level
+        level = np.empty(len(new), dtype=np.int64)
+        last = {}
+        for i, (h, a) in enumerate(zip(home.tolist(), away.tolist())):
+            level[i] = max(last.get(h, -1), last.get(a, -1)) + 1
+            last[h] = last[a] = level[i]
+
+        hg = new["homeScore"].to_numpy(dtype=np.int64)
+        ag = new["awayScore"].to_numpy(dtype=np.int64)
+        when = new["utcDate"].to_numpy(dtype=np.int64)
+        season = new["season"].to_numpy(dtype=object)
+
+        order = np.argsort(level, kind="stable")
+        bounds = np.flatnonzero(np.diff(level[order])) + 1
+        for rows in np.split(order, bounds):
+            self._apply(home[rows], away[rows], hg[rows], ag[rows], when[rows], season[rows])
+
+        self.seen.update(i for i in new["id"].tolist() if i is not None)
+        for col in HISTORY_COLUMNS:
+            self.history[col] += new[col].tolist()
+        self._advance(int(when.max()))
+
+    def _remember(self, record):
+        for col in HISTORY_COLUMNS:
+            self.history[col].append(record[col])
+        self._advance(record["utcDate"])
+
+    def _advance(self, when):
+        self.latest = when if self.latest is None else max(self.latest, when)
+
+    # -----------------------------
+    # As-of reads
+    # -----------------------------
+    def _log(self):
+        if not self._log_time:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        times = np.concatenate(self._log_time)
+        teams = np.concatenate(self._log_team)
+        ratings = np.concatenate(self._log_rating)
+        self._log_time, self._log_team, self._log_rating = [times], [teams], [ratings]
+        return times, teams, ratings
+
+    def snapshot(self, when=None) -> pd.Series:
+        """Every team's rating from matches kicking off strictly before `when` (default: now)."""
+        if when is None:
+            return pd.Series(self.ratings.copy(), index=self.teams, name="rating")
+        times, teams, ratings = self._log()
+        mask = times < _ns_one(when)
+        out = np.full(len(self.teams), self.initial)
+        # Log entries for a team are in kickoff order, so the last one wins
+        latest = np.full(len(self.teams), -1)
+        np.maximum.at(latest, teams[mask], np.flatnonzero(mask))
+        has = latest >= 0
+        out[has] = ratings[latest[has]]
+        return pd.Series(out, index=self.teams, name="rating")
+
+    def rating_at(self, teams, when) -> np.ndarray:
+        """Rating of each team just before each kickoff (aligned arrays), via one as-of join."""
+        times, ids, ratings = self._log()
+        log = pd.DataFrame({"team": ids, "utcDate": times, "rating": ratings}).sort_values("utcDate", kind="stable")
+        probe = pd.DataFrame({
+            "team": [self.index.get(t, -1) for t in teams],
+            "utcDate": _ns(when),
+            "row": np.arange(len(teams)),
+        }).sort_values("utcDate", kind="stable")
+        joined = pd.merge_asof(probe, log, on="utcDate", by="team", allow_exact_matches=False)
+        out = np.full(len(teams), self.initial)
+        out[joined["row"].to_numpy()] = joined["rating"].fillna(self.initial).to_numpy()
+        return out
+
+    def features(self, pairs) -> np.ndarray:
+        """(home rating, away rating, expected home score) per (home, away) pair, as of now."""
+        home = np.array([self[h] for h, _ in pairs])
+        away = np.array([self[a] for _, a in pairs])
+        return np.column_stack([home, away, self.expected(home, away)]) if len(pairs) else np.empty((0, 3))
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def to_dict(self) -> dict:
+        times, teams, ratings = self._log()
+        return {
+            "params": {"k": self.k, "home_advantage": self.home_advantage, "initial": self.initial,
+                       "season_regression": self.season_regression},
+            "teams": self.teams, "ratings": self.ratings.tolist(),
+            "last_season": [None if s is None else s for s in self.last_season.tolist()],
+            "seen": sorted(self.seen),
+            "history": {col: [_plain(v) for v in values] for col, values in self.history.items()},
+            "log": {"time": times.tolist(), "team": teams.tolist(), "rating": ratings.tolist()},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        engine = cls(**d["params"])
+        engine.teams = list(d["teams"])
+        engine.index = {t: i for i, t in enumerate(engine.teams)}
+        engine.ratings = np.asarray(d["ratings"], dtype=np.float64)
+        engine.last_season = np.asarray(d["last_season"], dtype=object)
+        engine.seen = set(d["seen"])
+        engine.replayable = "history" in d
+        engine.history = d.get("history") or {col: [] for col in HISTORY_COLUMNS}
+        engine._log_time = [np.asarray(d["log"]["time"], dtype=np.int64)]
+        engine._log_team = [np.asarray(d["log"]["team"], dtype=np.int64)]
+        engine._log_rating = [np.asarray(d["log"]["rating"], dtype=np.float64)]
+        if len(engine._log_time[0]):
+            engine.latest = int(engine._log_time[0].max())
+        return engine
+
+
+def _plain(value):
+    """JSON-safe scalar (NumPy ints from pandas frames are not)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def load_ratings(path=None):
+    """The saved engine (default: in the current snapshot), or None if ratings haven't been built yet."""
+    path = path or data_path(RATINGS_PATH)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return EloRatings.from_dict(json.load(f))
+
+
+def save_ratings(engine, path=None):
+    path = path or data_path(RATINGS_PATH)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(engine.to_dict(), f)
+    os.replace(tmp, path)
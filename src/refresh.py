@@ -0,0 +1,80 @@
+# src/refresh.py
+# Minimal DAG runner for the data refresh (see scripts/refresh_data.py)
+#
+# A pipeline is a set of named stages; each stage is called with the results
+# of the stages it depends on (`after` only orders, passing nothing). Stages
+# run level by level, and the stages of one level run concurrently, so
+# independent API pulls overlap while every payload is fetched exactly once
+# and shared by whatever consumes it.
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.metrics import span
+
+
+class Stage:
+    def __init__(self, name, run, deps=(), after=()):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.after = tuple(after)
+
+    @property
+    def requires(self):
+        return self.deps + self.after
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)})"
+
+
+class Pipeline:
+    """Named stages with dependencies, run in topological levels."""
+
+    def __init__(self, max_workers=5):
+        self.stages = {}
+        self.max_workers = max_workers
+
+    def add(self, name, run, deps=(), after=()):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage {name!r}")
+        self.stages[name] = Stage(name, run, deps, after)
+        return name
+
+    def __contains__(self, name):
+        return name in self.stages
+
+    def levels(self, targets=None):
+        """Stages needed for `targets` (default: all), grouped so each level only depends on earlier ones."""
+        needed, todo = set(), list(targets or self.stages)
+        while todo:
+            name = todo.pop()
+            if name in needed:
+                continue
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage {name!r}")
+            needed.add(name)
+            todo.extend(self.stages[name].requires)
+
+        levels, done = [], set()
+        while len(done) < len(needed):
+            level = sorted(n for n in needed - done if set(self.stages[n].requires) <= done)
+            if not level:
+                raise ValueError(f"Dependency cycle among {sorted(needed - done)}")
+            levels.append(level)
+            done.update(level)
+        return levels
+
+    def run(self, targets=None):
+        """Run what `targets` need; returns stage name -> result."""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="refresh") as pool:
+            for level in self.levels(targets):
+                futures = {name: pool.submit(self._run_stage, name, results) for name in level}
+                for name, future in futures.items():
+                    results[name] = future.result()
+        return results
+
+    def _run_stage(self, name, results):
+        stage = self.stages[name]
+        with span(f"refresh.{name}"):
+            return stage.run(*[results[d] for d in stage.deps])
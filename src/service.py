@@ -0,0 +1,445 @@
+# src/service.py
+# Async HTTP prediction service with request micro-batching
+#
+#   python -m src.service --port 8080 --workers 4
+#   python -m src.service --backend linear       # NumPy logistic model, ~µs per pair
+#
+#   GET  /predict?home=ARS&away=CHE
+#   GET  /predict?competition=ELC&home=Leeds&away=Burnley
+#   POST /predict   {"home": "ARS", "away": "CHE"}
+#                   {"competition": "ELC", "matches": [{"home": "...", "away": "..."}, ...]}
+#   GET  /metrics   latency percentiles, queue depth and batch counters
+#   GET  /health
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import signal
+import socket
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from src.competitions import LRUCache, competition_code, partition
+from src.constants import DEFAULT_COMPETITION, OUTCOME_LABELS
+from src.data_loader import data_version, load_team_table
+from src.prediction_log import log_prediction
+from src.predictor import (
+    BACKEND_ENV, BACKENDS, DEFAULT_BACKEND, artifact_signature, load_model, matchup_sources,
+    model_version, predict_matches, team_feature_matrix,
+)
+from src.utils import normalize_team_name
+
+BATCH_WINDOW = 0.005   # seconds to wait for more requests after the first one
+MAX_BATCH = 1024
+LATENCY_SAMPLES = 10_000
+MAX_BODY = 1 << 20
+STALE_CHECK_INTERVAL = 5.0  # seconds between checks of a predictor's files
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -----------------------------
+# Model
+# -----------------------------
+class Predictor:
+    """One competition's model, team table and feature matrix.
+
+    Competitions preloaded before workers are forked are shared with every
+    worker copy-on-write instead of each loading its own copy. A predictor
+    goes stale when a retrain or a published data snapshot (see
+    scripts/refresh_data.py) changes the files it was loaded from; those
+    are stat()ed at most every STALE_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, backend=None, competition=None):
+        self.competition = competition_code(competition)
+        self.signature = artifact_signature(matchup_sources(self.competition))
+        self.model_version = model_version(backend, self.competition)
+        self.data_version = data_version(partition(self.competition).stats)
+        self.model, self.le, self.class_order = load_model(backend, self.competition)
+        self.features = team_feature_matrix(load_team_table(self.competition))
+        self.teams = [str(t) for t in self.features[0].teams]
+        self.checked = time.monotonic()
+        self.stale = False
+
+    def is_stale(self):
+        now = time.monotonic()
+        if not self.stale and now - self.checked >= STALE_CHECK_INTERVAL:
+            self.checked = now
+            self.stale = self.signature != artifact_signature(matchup_sources(self.competition))
+        return self.stale
+
+    def resolve(self, name):
+        team = normalize_team_name(name, self.teams) if name else None
+        if team not in self.features[0]:
+            raise HttpError(400, f"Unknown team: {name}")
+        return team
+
+    def score(self, pairs):
+        return predict_matches(self.model, self.le, self.class_order,
+                               self.features[0], pairs, features=self.features)
+
+
+class PredictorPool:
+    """Predictors by competition, loaded on first request, reloaded once stale, kept in an LRU."""
+
+    def __init__(self, backend=None, capacity=None):
+        self.backend = backend
+        self.cache = LRUCache(lambda code: Predictor(backend, code), capacity,
+                              name="service.predictor_cache")
+
+    def get(self, competition=None):
+        try:
+            code = competition_code(competition)
+        except ValueError as exc:
+            raise HttpError(400, str(exc))
+        try:
+            return self.cache.get(code, stale=Predictor.is_stale)
+        except FileNotFoundError:
+            raise HttpError(404, f"No model or team stats for competition {code}")
+
+    def peek(self, competition=None):
+        """The loaded predictor, stale or not, or None; never loads."""
+        try:
+            return self.cache.peek(competition_code(competition))
+        except ValueError:
+            return None  # let get() report it
+
+    @staticmethod
+    def score(items):
+        """Score (predictor, home, away) items, one model call per predictor."""
+        out = np.empty((len(items), len(OUTCOME_LABELS)))
+        groups = {}
+        for i, (predictor, _, _) in enumerate(items):
+            groups.setdefault(id(predictor), (predictor, []))[1].append(i)
+        for predictor, rows in groups.values():
+            out[rows] = predictor.score([items[i][1:] for i in rows])
+        return out
+
+
+# -----------------------------
+# Micro-batching
+# -----------------------------
+class MicroBatcher:
+    """Collects concurrent (predictor, home, away) requests and scores them together.
+
+    The first queued request opens a batch; whatever else arrives within
+    `window` seconds (up to `max_batch`) is scored in the same model call.
+    Scoring runs on one background thread so the event loop keeps accepting.
+    """
+
+    def __init__(self, score, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.score = score
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.batches = 0
+        self.batched_pairs = 0
+
+    async def submit(self, predictor, home, away):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(((predictor, home, away), future))
+        return await future
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch and self.window > 0:
+                await asyncio.sleep(self.window)
+                self._drain(batch)
+
+            items = [item for item, _ in batch]
+            try:
+                probs = await loop.run_in_executor(self.executor, self.score, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            self.batches += 1
+            self.batched_pairs += len(batch)
+            for (_, future), row in zip(batch, probs):
+                if not future.done():
+                    future.set_result(row)
+
+    def metrics(self):
+        latencies = np.asarray(self.latencies) * 1000
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        return {
+            "pid": os.getpid(),
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_pairs / self.batches if self.batches else 0.0,
+            "queue_depth": self.queue.qsize(),
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+        }
+
+
+# -----------------------------
+# HTTP
+# -----------------------------
+async def read_request(reader):
+    """(method, target, headers, body), or None when the client closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+def parse_match(entry, competition=None):
+    """(home, away, competition) from one JSON match object, or a 400."""
+    if not isinstance(entry, dict):
+        raise HttpError(400, "Each match must be an object with \"home\" and \"away\"")
+    home, away = entry.get("home"), entry.get("away")
+    competition = entry.get("competition", competition)
+    if not isinstance(home, str) or not isinstance(away, str):
+        raise HttpError(400, "\"home\" and \"away\" must be strings")
+    if competition is not None and not isinstance(competition, str):
+        raise HttpError(400, "\"competition\" must be a string")
+    return home, away, competition
+
+
+class PredictionService:
+    def __init__(self, pool, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.batcher = MicroBatcher(pool.score, window, max_batch)
+        self.reloading = {}  # competition -> reload running in the executor
+
+    async def predictor(self, competition):
+        loop = asyncio.get_running_loop()
+        current = self.pool.peek(competition)
+        if current is None:
+            # First request for a competition: load it off the event loop
+            return await loop.run_in_executor(None, self.pool.get, competition)
+        code = current.competition
+        if current.is_stale() and code not in self.reloading:
+            # Keep serving the loaded predictor until its replacement is in the pool
+            reload = loop.run_in_executor(None, self.pool.get, code)
+            self.reloading[code] = reload
+            reload.add_done_callback(lambda done: self._reloaded(code, done))
+        return current
+
+    def _reloaded(self, code, done):
+        self.reloading.pop(code, None)
+        if not done.cancelled() and done.exception() is not None:
+            print(f"⚠️ Reloading {code} failed, still serving the previous model: {done.exception()}")
+
+    async def predict(self, home_name, away_name, competition=None):
+        predictor = await self.predictor(competition)
+        home = predictor.resolve(home_name)
+        away = predictor.resolve(away_name)
+        started = time.perf_counter()
+        probs = await self.batcher.submit(predictor, home, away)
+        log_prediction(home, away, probs, model_version=predictor.model_version,
+                       data_version=predictor.data_version,
+                       latency=time.perf_counter() - started, source="service",
+                       competition=predictor.competition)
+        return {
+            "competition": predictor.competition,
+            "home_team": home,
+            "away_team": away,
+            "probabilities": {lbl: float(p) for lbl, p in zip(OUTCOME_LABELS, probs)},
+            "prediction": OUTCOME_LABELS[int(np.argmax(probs))],
+        }
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == "/health":
+            return {"status": "ok"}
+        if url.path == "/metrics":
+            return {**self.batcher.metrics(), "competitions_loaded": self.pool.cache.keys()}
+        if url.path != "/predict":
+            raise HttpError(404, f"No route for {url.path}")
+
+        if method == "GET":
+            query = parse_qs(url.query)
+            return await self.predict(query.get("home", [None])[0], query.get("away", [None])[0],
+                                      query.get("competition", [None])[0])
+        if method != "POST":
+            raise HttpError(405, f"{method} not allowed on /predict")
+
+        try:
+            data = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HttpError(400, "Body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "Expected a JSON object")
+        competition = data.get("competition")
+        if "matches" in data:
+            if not isinstance(data["matches"], list):
+                raise HttpError(400, "\"matches\" must be a list")
+            matches = [parse_match(m, competition) for m in data["matches"]]
+            # Every match joins the same micro-batch
+            results = await asyncio.gather(*(self.predict(*m) for m in matches))
+            return {"predictions": list(results)}
+        return await self.predict(*parse_match(data))
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    started = time.perf_counter()
+                    method, target, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = 200, await self.route(method, target, body)
+                except HttpError as exc:
+                    status, payload, keep_alive = exc.status, {"error": str(exc)}, False
+                    started = None
+                except Exception as exc:
+                    status, payload, keep_alive = 500, {"error": str(exc)}, False
+                    started = None
+
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if started is not None:
+                    self.batcher.requests += 1
+                    self.batcher.latencies.append(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+# -----------------------------
+# Server
+# -----------------------------
+async def _serve(sock, pool, window, max_batch):
+    service = PredictionService(pool, window, max_batch)
+    server = await asyncio.start_server(service.handle, sock=sock, backlog=1024)
+    async with server:
+        await asyncio.gather(server.serve_forever(), service.batcher.run())
+
+
+def serve(host="127.0.0.1", port=8080, workers=1, window=BATCH_WINDOW, max_batch=MAX_BATCH,
+          backend=None, preload=(DEFAULT_COMPETITION,), cache_size=None):
+    """Load the `preload` competitions once, then serve from `workers` forked processes.
+
+    All workers accept on the same listening socket; /metrics reports the
+    worker that answered it. Other competitions load in a worker on their
+    first request and share that worker's LRU of `cache_size` entries.
+    """
+    pool = PredictorPool(backend, cache_size)
+    for competition in preload:
+        predictor = pool.get(competition)
+        print(f"✅ Loaded {predictor.competition} ({predictor.model_version})")
+    sock = socket.create_server((host, port), backlog=1024)
+    print(f"✅ Serving predictions on http://{host}:{port} with {workers} worker(s)")
+
+    if workers <= 1 or not hasattr(os, "fork"):
+        try:
+            asyncio.run(_serve(sock, pool, window, max_batch))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    # Keep the loaded objects out of the GC's reach so collections in the
+    # workers don't touch (and copy) the shared pages
+    gc.freeze()
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+            try:
+                asyncio.run(_serve(sock, pool, window, max_batch))
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve match predictions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="forked worker processes sharing the loaded model")
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW * 1000,
+                        help="how long a batch stays open for more requests")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help=f"model backend (default: ${BACKEND_ENV} or {DEFAULT_BACKEND})")
+    parser.add_argument("--competitions", default=DEFAULT_COMPETITION,
+                        help="comma-separated competitions to load before forking workers")
+    parser.add_argument("--cache-size", type=int, default=None,
+                        help="competitions kept loaded per worker (default: $FOOTY_COMPETITION_CACHE or 4)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.window_ms / 1000, args.max_batch, args.backend,
+          args.competitions.split(","), args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
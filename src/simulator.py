@@ -0,0 +1,107 @@
+# src/simulator.py
+# Vectorized Monte Carlo simulation of the rest of a season
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+TITLE_SPOTS = 1
+TOP_SPOTS = 4
+RELEGATION_SPOTS = 3
+
+# Points for (home, away) per outcome, in OUTCOME_LABELS order
+HOME_POINTS = np.array([3, 1, 0], dtype=np.int16)
+AWAY_POINTS = np.array([0, 1, 3], dtype=np.int16)
+
+
+def remaining_fixtures(matches: pd.DataFrame) -> pd.DataFrame:
+    """Unplayed (home, away) fixtures from a parsed matches frame."""
+    unplayed = matches["homeScore"].isna() | matches["awayScore"].isna()
+    fixtures = matches.loc[unplayed, ["homeTeam", "awayTeam"]]
+    return fixtures.rename(columns={"homeTeam": "home_team", "awayTeam": "away_team"}).reset_index(drop=True)
+
+
+def _simulate_chunk(seed, n_sims, cum_probs, home, away, base_points, goal_diff):
+    """Final-position counts, shape (teams, teams), for `n_sims` seasons."""
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_points)
+
+    # One uniform draw per (simulation, fixture) -> outcome 0/1/2
+    u = rng.random((n_sims, len(home)))
+    outcome = (u >= cum_probs[:, 0]).astype(np.int8) + (u >= cum_probs[:, 1])
+
+    # Scatter fixture points onto teams: simulation s, team t lives at s*T + t
+    offsets = (np.arange(n_sims) * n_teams)[:, None]
+    points = np.bincount((offsets + home).ravel(), HOME_POINTS[outcome].ravel(), n_sims * n_teams)
+    points += np.bincount((offsets + away).ravel(), AWAY_POINTS[outcome].ravel(), n_sims * n_teams)
+    points = points.reshape(n_sims, n_teams) + base_points
+
+    # Rank by points, then current goal difference, then a random draw
+    score = points * 1e3 + goal_diff + rng.random((n_sims, n_teams)) * 0.5
+    order = np.argsort(-score, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams), axis=1)
+
+    return np.bincount((np.arange(n_teams) * n_teams + positions).ravel(),
+                       minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+
+def simulate_season(overview: pd.DataFrame, fixtures: pd.DataFrame, probs, n_sims=100_000,
+                    seed=0, workers=1, chunk_size=10_000):
+    """Simulate the remaining `fixtures` `n_sims` times.
+
+    `overview` holds the current table (team, points, goal_diff or
+    goals_for/goals_against); `probs` is the (fixtures, 3) HomeWin/Draw/AwayWin
+    array from `predict_matches`. Simulations run in chunks seeded from one
+    SeedSequence, so results are identical for any `workers` count.
+
+    Returns (summary, positions): one row per team with expected points and
+    title / top-4 / relegation probabilities, and the team x final-position
+    probability matrix.
+    """
+    teams = overview["team"].astype(str).tolist()
+    team_ids = {team: i for i, team in enumerate(teams)}
+    unknown = sorted(set(fixtures["home_team"]).union(fixtures["away_team"]) - set(team_ids))
+    if unknown:
+        raise ValueError(f"Fixtures reference teams missing from the table: {unknown}")
+
+    base_points = overview["points"].to_numpy(dtype=np.int64)
+    if "goal_diff" in overview:
+        goal_diff = overview["goal_diff"].to_numpy(dtype=np.float64)
+    else:
+        goal_diff = (overview["goals_for"] - overview["goals_against"]).to_numpy(dtype=np.float64)
+    home = fixtures["home_team"].map(team_ids).to_numpy(dtype=np.int64)
+    away = fixtures["away_team"].map(team_ids).to_numpy(dtype=np.int64)
+
+    probs = np.asarray(probs, dtype=np.float64).reshape(len(fixtures), 3)
+    cum_probs = np.cumsum(probs / probs.sum(axis=1, keepdims=True), axis=1)[:, :2]
+
+    sizes = [min(chunk_size, n_sims - start) for start in range(0, n_sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (cum_probs, home, away, base_points, goal_diff)
+
+    counts = np.zeros((len(teams), len(teams)), dtype=np.int64)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_simulate_chunk, seeds, sizes, *[[a] * len(sizes) for a in args]):
+                counts += chunk
+    else:
+        for s, size in zip(seeds, sizes):
+            counts += _simulate_chunk(s, size, *args)
+
+    position_probs = counts / n_sims
+    n = len(teams)
+    expected_points = base_points + np.bincount(home, probs @ HOME_POINTS, n) + np.bincount(away, probs @ AWAY_POINTS, n)
+    summary = pd.DataFrame({
+        "team": teams,
+        "points": base_points,
+        "expected_points": expected_points,
+        "mean_position": position_probs @ np.arange(1, n + 1),
+        "p_title": position_probs[:, :TITLE_SPOTS].sum(axis=1),
+        "p_top4": position_probs[:, :TOP_SPOTS].sum(axis=1),
+        "p_relegation": position_probs[:, n - RELEGATION_SPOTS:].sum(axis=1),
+    }).sort_values(["mean_position", "team"], ignore_index=True)
+    positions = pd.DataFrame(position_probs, index=pd.Index(teams, name="team"),
+                             columns=np.arange(1, n + 1)).loc[summary["team"]]
+    return summary, positions
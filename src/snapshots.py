@@ -0,0 +1,121 @@
+# src/snapshots.py
+# Versioned data snapshots published by an atomic pointer swap
+#
+# A refresh (see src/refresh.py) writes all of its outputs into a new
+# data/snapshots/<version>/ directory, then replaces data/CURRENT, a
+# one-line file naming the version, with os.replace. Readers resolve data
+# paths through the pointer, so they see the old snapshot or the new one,
+# never a half-written mix. Snapshots are never modified after publishing.
+# Without a pointer, the flat data/ layout is read as before.
+
+import os
+import shutil
+import time
+
+from src.constants import DATA_DIR
+
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+POINTER_PATH = os.path.join(DATA_DIR, "CURRENT")
+# Superseded snapshots kept for processes that are still reading them
+KEEP_SNAPSHOTS = 3
+
+
+def current_version(pointer=POINTER_PATH):
+    """Name of the published snapshot, or None when data/ is still flat."""
+    try:
+        with open(pointer, "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_path(version):
+    return os.path.join(SNAPSHOT_DIR, version)
+
+
+def data_root(version=None):
+    """Directory the data files live in: the given/current snapshot, else DATA_DIR."""
+    version = version or current_version()
+    return snapshot_path(version) if version else DATA_DIR
+
+
+def data_path(path, root=None):
+    """`path` (under DATA_DIR) inside `root`, by default the current snapshot."""
+    return os.path.join(root or data_root(), os.path.relpath(path, DATA_DIR))
+
+
+def list_snapshots():
+    """Published snapshot versions, oldest first."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    return sorted(v for v in os.listdir(SNAPSHOT_DIR) if not v.startswith("."))
+
+
+# -----------------------------
+# Writing
+# -----------------------------
+def new_version():
+    """Sortable, unique version name (UTC time, then a counter on collision)."""
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    version, n = stamp, 1
+    while os.path.exists(snapshot_path(version)) or os.path.exists(_staging_path(version)):
+        version, n = f"{stamp}-{n}", n + 1
+    return version
+
+
+def _staging_path(version):
+    return os.path.join(SNAPSHOT_DIR, f".tmp-{version}")
+
+
+def stage_snapshot(version):
+    """Empty staging directory for `version`; pass it to publish() once written."""
+    path = _staging_path(version)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return path
+
+
+def carry_over(src_root, dst_root, rel_paths):
+    """Hard-link (or copy) the files under `rel_paths` from one root into another.
+
+    Unchanged outputs share inodes with the previous snapshot, so they cost
+    no space and keep their mtimes (and with them every cache key).
+    """
+    for rel in rel_paths:
+        src = os.path.join(src_root, rel)
+        if os.path.isdir(src):
+            files = [os.path.join(root, name) for root, _, names in os.walk(src) for name in names]
+        else:
+            files = [src] if os.path.exists(src) else []
+        for path in files:
+            _link(path, os.path.join(dst_root, os.path.relpath(path, src_root)))
+
+
+def _link(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def publish(staging, version, keep=KEEP_SNAPSHOTS, pointer=POINTER_PATH):
+    """Move a staged snapshot into place, then swap the pointer to it."""
+    final = snapshot_path(version)
+    os.rename(staging, final)
+    tmp = f"{pointer}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(f"{version}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, pointer)
+    prune(keep)
+    return final
+
+
+def prune(keep=KEEP_SNAPSHOTS):
+    """Delete all but the `keep` newest snapshots besides the current one."""
+    current = current_version()
+    old = [v for v in list_snapshots() if v != current]
+    for version in old[:max(len(old) - keep, 0)]:
+        shutil.rmtree(snapshot_path(version), ignore_errors=True)
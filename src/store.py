@@ -0,0 +1,206 @@
+# src/store.py
+# Typed columnar store for the processed team tables.
+#
+# A bundle is a directory with one .npy file per column plus schema.json,
+# which is written last and doubles as the bundle's version stamp. Columns
+# load with mmap_mode="r", so reading a bundle parses nothing. Each write
+# goes to a new <name>.<ns> directory and <name> is a symlink swapped onto
+# it, so readers never find the bundle missing or half-written.
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SCHEMA_FILE = "schema.json"
+
+# Recent form: -1/0/1 per match, oldest first, right-padded with FORM_PAD
+FORM_LENGTH = 5
+FORM_PAD = -128
+
+# Superseded bundle versions stay this long for readers that resolved them
+VERSION_GRACE_SECONDS = 60
+
+_INT = "int64"
+_FLOAT = "float64"
+
+TEAM_STATS_SCHEMA = {
+    "team": "str",
+    "played": _INT, "wins": _INT, "draws": _INT, "losses": _INT,
+    "goals_for": _INT, "goals_against": _INT, "goal_diff": _INT, "points": _INT,
+    "home_wins": _INT, "home_draws": _INT, "home_losses": _INT,
+    "away_wins": _INT, "away_draws": _INT, "away_losses": _INT,
+    "weighted_home_wins": _FLOAT, "weighted_home_draws": _FLOAT, "weighted_home_losses": _FLOAT,
+    "weighted_away_wins": _FLOAT, "weighted_away_draws": _FLOAT, "weighted_away_losses": _FLOAT,
+    "form_last_5": f"int8[{FORM_LENGTH}]",
+    "form_total": _INT,
+    "strength_weighted_form": _FLOAT,
+}
+
+TEAM_OVERVIEW_SCHEMA = {
+    "team": "str", "position": _INT, "played": _INT,
+    "wins": _INT, "draws": _INT, "losses": _INT,
+    "goals_for": _INT, "goals_against": _INT, "points": _INT,
+}
+
+
+def manifest_path(path):
+    return os.path.join(path, SCHEMA_FILE)
+
+
+def bundle_version(path):
+    """mtime of the bundle's schema file, or None if there is no bundle."""
+    try:
+        return os.stat(manifest_path(path)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# -----------------------------
+# Form encoding
+# -----------------------------
+def encode_form(values) -> np.ndarray:
+    """List of form vectors (lists, arrays or '[1, 0]' strings) -> int8 matrix."""
+    out = np.full((len(values), FORM_LENGTH), FORM_PAD, dtype=np.int8)
+    for i, form in enumerate(values):
+        if isinstance(form, str):
+            form = json.loads(form) if form.strip() else []
+        elif form is None or (np.ndim(form) == 0 and form != form):  # None / NaN
+            form = []
+        form = list(form)[-FORM_LENGTH:]
+        out[i, :len(form)] = form
+    return out
+
+
+def decode_form(row) -> list:
+    """One int8 form row -> list of ints without padding."""
+    return [int(v) for v in row if v != FORM_PAD]
+
+
+# -----------------------------
+# Bundles
+# -----------------------------
+def _column_array(values, kind):
+    if kind == "str":
+        return np.asarray([str(v) for v in values], dtype=np.str_)
+    if kind.startswith("int8["):
+        return encode_form(list(values))
+    return np.asarray(values, dtype=kind)
+
+
+def frame_to_columns(frame: pd.DataFrame, schema: dict) -> dict:
+    """Cast the schema's columns of `frame` to their typed arrays."""
+    missing = [c for c in schema if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    return {name: _column_array(frame[name].tolist(), kind) for name, kind in schema.items()}
+
+
+def _superseded(parent, name, current):
+    """(version, ns it was superseded at) for every version of `name` but `current`."""
+    pattern = re.compile(rf"^{re.escape(name)}\.(legacy-)?(\d+)$")
+    found = sorted((int(m.group(2)), bool(m.group(1)), v)
+                   for v in os.listdir(parent) if (m := pattern.match(v)))
+    out = []
+    for i, (ns, legacy, version) in enumerate(found):
+        if version != current:
+            # A legacy directory is stamped when it was moved aside; others when their successor was written
+            out.append((version, ns if legacy or i + 1 == len(found) else found[i + 1][0]))
+    return out
+
+
+def write_array_dir(path, arrays: dict, manifest: dict):
+    """Write one .npy per array plus `manifest` as schema.json, then point `path` at them.
+
+    Files go into a new sibling directory <name>.<ns>; `path` is a relative
+    symlink to it, replaced atomically with os.replace, so a reader always
+    finds a complete version at `path`. The version the link pointed at
+    before, and any superseded within VERSION_GRACE_SECONDS, are kept for
+    readers that resolved them just before a swap; older ones are removed.
+    A plain directory left at `path` by older code is moved aside on the
+    first write (the only moment `path` is missing).
+    """
+    parent, name = os.path.split(os.path.abspath(path))
+    version = f"{name}.{time.time_ns()}"
+    tmp = os.path.join(parent, f".{version}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    try:
+        for key, arr in arrays.items():
+            np.save(os.path.join(tmp, f"{key}.npy"), arr)
+        with open(manifest_path(tmp), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(tmp, os.path.join(parent, version))
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    previous = os.readlink(path) if os.path.islink(path) else None
+    if previous is None and os.path.isdir(path):
+        previous = f"{name}.legacy-{time.time_ns()}"
+        os.rename(path, os.path.join(parent, previous))
+    link = os.path.join(parent, f".{name}.link-{os.getpid()}")
+    os.symlink(version, link)
+    os.replace(link, path)
+
+    cutoff = time.time_ns() - int(VERSION_GRACE_SECONDS * 1e9)
+    for old, superseded_at in _superseded(parent, name, version):
+        if old != previous and superseded_at < cutoff:
+            shutil.rmtree(os.path.join(parent, old), ignore_errors=True)
+
+
+def resolve_array_dir(path):
+    """The concrete version directory `path` points at; read a whole bundle through this."""
+    return os.path.realpath(path)
+
+
+def read_array_dir(path, names, mmap=True) -> dict:
+    """Array name -> array for `names`, memory-mapped read-only by default."""
+    mode = "r" if mmap else None
+    return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in names}
+
+
+def read_manifest(path) -> dict:
+    with open(manifest_path(path), "r") as f:
+        return json.load(f)
+
+
+def write_bundle(path, frame: pd.DataFrame, schema: dict):
+    """Write `frame` as a typed bundle, replacing any bundle at `path`."""
+    columns = frame_to_columns(frame, schema)
+    manifest = {name: {"kind": schema[name], "dtype": arr.dtype.str, "shape": list(arr.shape[1:])}
+                for name, arr in columns.items()}
+    write_array_dir(path, columns, {"rows": len(frame), "columns": manifest})
+
+
+def read_bundle(path, mmap=True) -> dict:
+    """Column name -> array, memory-mapped read-only by default."""
+    path = resolve_array_dir(path)
+    return read_array_dir(path, read_manifest(path)["columns"], mmap)
+
+
+def bundle_to_frame(columns: dict) -> pd.DataFrame:
+    """DataFrame view of a bundle; form rows become plain lists."""
+    import pandas as pd
+
+    data = {}
+    for name, arr in columns.items():
+        if arr.ndim == 2:
+            data[name] = [decode_form(row) for row in arr]
+        else:
+            data[name] = np.asarray(arr)
+    return pd.DataFrame(data)
+
+
+def export_csv(frame: pd.DataFrame, path):
+    """Human-readable CSV copy; list columns are written as '[1, 0, -1]'."""
+    frame.to_csv(path, index=False)
@@ -0,0 +1,70 @@
+# src/team_table.py
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported lazily; pandas is slow to import
+
+
+class TeamTable:
+    """Team stats keyed by a dense integer id, one typed NumPy array per column.
+
+    Built once per data load; `row` gives O(1) access to one team and
+    `gather` pulls any set of columns for many teams in one indexing step.
+    """
+
+    def __init__(self, teams, columns):
+        self.teams = list(teams)
+        self.index = {}
+        for i, team in enumerate(self.teams):
+            self.index.setdefault(team, i)  # first row wins, like .iloc[0]
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, key: str = "team"):
+        columns = {c: df[c].to_numpy() for c in df.columns}
+        return cls(df[key].tolist(), columns)
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __contains__(self, team):
+        return team in self.index
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def id(self, team) -> int:
+        try:
+            return self.index[team]
+        except KeyError:
+            raise KeyError(f"Unknown team: {team}") from None
+
+    def ids(self, teams) -> np.ndarray:
+        return np.array([self.id(t) for t in teams], dtype=np.intp)
+
+    def row(self, team) -> dict:
+        """All stats for one team as plain Python scalars."""
+        i = self.id(team)
+        return {name: _scalar(col[i]) for name, col in self.columns.items()}
+
+    def gather(self, ids, columns) -> np.ndarray:
+        """Float matrix of `columns` for the given team ids, shape (len(ids), len(columns))."""
+        ids = np.asarray(ids, dtype=np.intp)
+        return np.column_stack([self.columns[c][ids].astype(float) for c in columns])
+
+    def to_frame(self) -> pd.DataFrame:
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
+def as_team_table(data) -> TeamTable:
+    """Accept either a TeamTable or a DataFrame with a `team` column."""
+    return data if isinstance(data, TeamTable) else TeamTable.from_frame(data)
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
@@ -1,9 +1,5 @@
 # src/utils.py
-import pandas as pd
-from src.constants import TEAM_STATS_PATH
-
-# Load the dataset for team name normalization
-df = pd.read_csv(TEAM_STATS_PATH)
+from src.data_loader import load_team_table
 
 TEAM_ALIAS = {
     "ARS": "Arsenal FC",
@@ -30,8 +26,13 @@ TEAM_ALIAS = {
 }
 
 
-def normalize_team_name(name: str):
-    """Normalize user input to match dataset team names."""
+def normalize_team_name(name: str, teams=None):
+    """Normalize user input to match dataset team names.
+
+    `teams` defaults to the teams in the current stats table.
+    """
+    if teams is None:
+        teams = load_team_table().teams
     name = name.strip().lower()
 
     # Check short alias (e.g. ARS → Arsenal FC)
@@ -40,12 +41,12 @@ def normalize_team_name(name: str):
         return TEAM_ALIAS[code]
 
     # Exact match
-    for team in df["team"].values:
+    for team in teams:
         if name == team.lower():
             return team
 
     # Partial match
-    for team in df["team"].values:
+    for team in teams:
         if name in team.lower():
             return team
 
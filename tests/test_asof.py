@@ -0,0 +1,94 @@
+# tests/test_asof.py
+# asof_features must equal a brute-force lookup over each match's history
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from scripts.build_team_stats import parse_matches
+from src.asof import asof_features, team_timeline
+from src.store import FORM_PAD
+
+N = 5
+
+
+@pytest.fixture(scope="module")
+def matches():
+    """Two competitions over two seasons, sharing some team names, partly unplayed."""
+    names = synthetic.team_names(30)
+    frames = []
+    for i, (comp, season, teams, played) in enumerate([
+        ("PL", 2024, names[:10], 1.0), ("PL", 2025, names[2:12], 0.6),
+        ("ELC", 2024, names[8:20], 1.0), ("ELC", 2025, names[10:21], 0.5),
+    ]):
+        frame = parse_matches(synthetic.season_matches(teams, seed=i, start=f"{season}-08-16",
+                                                      played_fraction=played))
+        frames.append(frame.assign(id=frame["id"] + 10_000 * i, competition=comp, season=season))
+    return pd.concat(frames, ignore_index=True)
+
+
+def brute_force(matches, match, team):
+    """`team`'s features before `match` kicked off, from earlier finished matches of its season."""
+    done = matches[matches["homeScore"].notna() & (matches["competition"] == match.competition)
+                   & (matches["season"] == match.season)]
+    before = done[done["utcDate"] < match.utcDate]
+
+    def record(side, until):
+        rows = before[((before["homeTeam"] == side) | (before["awayTeam"] == side)) & (before["utcDate"] < until)]
+        rows = rows.sort_values("utcDate")
+        gd = np.where(rows["homeTeam"] == side, rows["homeScore"] - rows["awayScore"],
+                      rows["awayScore"] - rows["homeScore"]).astype(int)
+        return rows, gd
+
+    rows, gd = record(team, match.utcDate)
+    results = np.sign(gd)
+    points = int(np.select([results == 1, results == 0], [3, 1], 0).sum())
+
+    weighted = 0.0
+    last = rows.tail(N)
+    for (_, m), r in zip(last.iterrows(), results[-N:] if len(results) else []):
+        opponent = m.awayTeam if m.homeTeam == team else m.homeTeam
+        _, opp_gd = record(opponent, match.utcDate)
+        opp_res = np.sign(opp_gd)
+        rating = 0.5 * np.select([opp_res == 1, opp_res == 0], [3, 1], 0).sum() + 0.5 * opp_gd.sum()
+        weighted += r * (rating + (0 if m.homeTeam == team else 5))
+
+    form = [FORM_PAD] * (N - min(len(results), N)) + list(results[-N:])
+    return {"played": len(rows), "points": points, "goal_diff": int(gd.sum()),
+            "form": int(results[-N:].sum()) if len(results) else 0,
+            "weighted_form": weighted, "form_vector": form}
+
+
+def test_matches_brute_force(matches):
+    features = asof_features(matches, N)
+    finished = matches[matches["homeScore"].notna()]
+    assert sorted(features["id"]) == sorted(finished["id"])
+
+    by_id = finished.set_index("id")
+    rng = np.random.default_rng(0)
+    for i in rng.choice(len(features), 120, replace=False):
+        row = features.iloc[i]
+        match = by_id.loc[row["id"]]
+        for prefix, team in (("home", match.homeTeam), ("away", match.awayTeam)):
+            assert row[f"{prefix}_team"] == team
+            expected = brute_force(matches, match, team)
+            for name in ("played", "points", "goal_diff", "form"):
+                assert row[f"{prefix}_{name}"] == expected[name], (row["id"], prefix, name)
+            assert row[f"{prefix}_weighted_form"] == pytest.approx(expected["weighted_form"]), (row["id"], prefix)
+
+
+def test_form_vectors(matches):
+    timeline = team_timeline(matches, N)
+    finished = matches[matches["homeScore"].notna()].set_index("id")
+    for _, row in timeline.sample(80, random_state=0).iterrows():
+        expected = brute_force(matches, finished.loc[row["id"]], row["team"])
+        assert list(row[f"form_last_{N}"]) == expected["form_vector"]
+
+
+def test_result_is_the_final_score(matches):
+    features = asof_features(matches, N)
+    scores = matches.set_index("id").loc[features["id"]]
+    expected = np.select([scores["homeScore"] > scores["awayScore"],
+                          scores["awayScore"] > scores["homeScore"]], ["HomeWin", "AwayWin"], "Draw")
+    assert (features["result"].to_numpy() == expected).all()
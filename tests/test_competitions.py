@@ -0,0 +1,85 @@
+# tests/test_competitions.py
+# LRUCache: loads run outside the cache lock and are shared by concurrent misses
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.competitions import LRUCache
+
+
+class SlowLoader:
+    """load(key) that blocks on `key`'s gate, counting calls."""
+
+    def __init__(self):
+        self.gates = {}
+        self.calls = []
+        self.started = threading.Event()
+
+    def gate(self, key):
+        return self.gates.setdefault(key, threading.Event())
+
+    def __call__(self, key):
+        self.calls.append(key)
+        self.started.set()
+        if not self.gate(key).wait(5):
+            raise TimeoutError(key)
+        if key == "bad":
+            raise FileNotFoundError(key)
+        return f"value-{key}"
+
+
+@pytest.fixture
+def loader():
+    return SlowLoader()
+
+
+def test_slow_load_does_not_block_other_keys(loader):
+    cache = LRUCache(loader, capacity=4)
+    loader.gate("PL").set()
+    assert cache.get("PL") == "value-PL"
+
+    with ThreadPoolExecutor(1) as pool:
+        cold = pool.submit(cache.get, "ELC")
+        assert loader.started.wait(5)
+        # ELC is still loading; hits on PL return at once
+        assert cache.get("PL") == "value-PL"
+        assert cache.peek("ELC") is None
+        loader.gate("ELC").set()
+        assert cold.result(5) == "value-ELC"
+
+
+def test_concurrent_misses_share_one_load(loader):
+    cache = LRUCache(loader, capacity=4)
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(cache.get, "PL") for _ in range(4)]
+        assert loader.started.wait(5)
+        loader.gate("PL").set()
+        assert [f.result(5) for f in futures] == ["value-PL"] * 4
+    assert loader.calls == ["PL"]
+
+
+def test_failed_load_reaches_every_waiter_and_is_not_cached(loader):
+    cache = LRUCache(loader, capacity=4)
+    with ThreadPoolExecutor(2) as pool:
+        futures = [pool.submit(cache.get, "bad") for _ in range(2)]
+        assert loader.started.wait(5)
+        loader.gate("bad").set()
+        for f in futures:
+            with pytest.raises(FileNotFoundError):
+                f.result(5)
+    assert "bad" not in cache
+    assert not cache.loading
+
+
+def test_stale_entries_reload_and_capacity_evicts(loader):
+    for key in "abc":
+        loader.gate(key).set()
+    cache = LRUCache(loader, capacity=2)
+    cache.get("a")
+    cache.get("b")
+    assert cache.get("a", stale=lambda value: True) == "value-a"
+    assert loader.calls == ["a", "b", "a"]
+    cache.get("c")
+    assert cache.keys() == ["a", "c"]
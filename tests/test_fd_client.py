@@ -0,0 +1,152 @@
+# tests/test_fd_client.py
+# FootballDataClient against a local http.server stub: cache revalidation,
+# max_age, the token bucket and 429/5xx retries
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.fd_client import FootballDataClient, TokenBucket, retry_after
+
+PAYLOAD = {"standings": [{"type": "TOTAL", "table": []}]}
+ETAG = '"v1"'
+
+
+class Stub(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with an ETag; answers 429 while `throttle` is positive
+    and 503 while `failing` is."""
+
+    requests = []
+    throttle = 0
+    failing = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Stub.requests.append((self.path, dict(self.headers)))
+        if Stub.throttle > 0:
+            Stub.throttle -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "7")
+            self.end_headers()
+            return
+        if Stub.failing > 0:
+            Stub.failing -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(PAYLOAD).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def server():
+    Stub.requests, Stub.throttle, Stub.failing = [], 0, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Stub)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/v4"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def client(server, clock, tmp_path):
+    c = FootballDataClient("token", base_url=server, cache_dir=str(tmp_path), retries=2)
+    c.bucket = TokenBucket(rate=2, per=1.0, clock=clock, sleep=clock.sleep)
+    return c
+
+
+def test_etag_revalidation_reuses_cached_body(client):
+    assert client.get("competitions/PL/standings", {"season": 2025}) == PAYLOAD
+    assert client.get("competitions/PL/standings", {"season": 2025}) == PAYLOAD
+
+    assert len(Stub.requests) == 2
+    first, second = (headers for _, headers in Stub.requests)
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"] == ETAG
+    assert first["X-Auth-Token"] == "token"
+
+
+def test_max_age_skips_the_network(client):
+    client.get("competitions/PL/matches", max_age=60)
+    assert client.get("competitions/PL/matches", max_age=60) == PAYLOAD
+    assert len(Stub.requests) == 1
+
+
+def test_token_bucket_waits_for_a_token(clock):
+    bucket = TokenBucket(rate=2, per=1.0, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_429_pauses_the_bucket_for_retry_after(client, clock):
+    Stub.throttle = 1
+    assert client.get("competitions/PL/standings") == PAYLOAD
+    assert len(Stub.requests) == 2
+    # The retry waited out Retry-After inside the bucket
+    assert sum(clock.sleeps) == pytest.approx(7)
+
+
+def test_429_gives_up_after_retries(client):
+    Stub.throttle = 10
+    with pytest.raises(requests.HTTPError):
+        client.get("competitions/PL/standings")
+    assert len(Stub.requests) == client.retries + 1
+
+
+def test_5xx_retries_go_through_the_bucket(client, clock):
+    Stub.failing = 2
+    acquired = []
+    acquire = client.bucket.acquire
+    client.bucket.acquire = lambda: acquire() or acquired.append(clock.now)
+    assert client.get("competitions/PL/standings") == PAYLOAD
+    assert len(Stub.requests) == 3
+    # Every attempt took a token, each retry after a backoff pause
+    assert acquired == [0, pytest.approx(0.5), pytest.approx(1.5)]
+
+
+def test_5xx_gives_up_after_retries(client):
+    Stub.failing = 10
+    with pytest.raises(requests.HTTPError):
+        client.get("competitions/PL/standings")
+    assert len(Stub.requests) == client.retries + 1
+
+
+def test_retry_after_parsing():
+    assert retry_after("3", default=1) == 3
+    assert retry_after(None, default=1) == 1
+    assert retry_after("soon", default=1) == 1
+    assert retry_after("Wed, 21 Oct 2015 07:28:00 GMT", default=1) == 0
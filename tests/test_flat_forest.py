@@ -0,0 +1,69 @@
+# tests/test_flat_forest.py
+# FlatForest must score exactly like the RandomForestClassifier it was exported from
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.predictor import flatten_forest, load_flat_forest, save_flat_forest
+from src.store import write_array_dir
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = np.digitize(X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=400), [-0.5, 0.5])
+    # Uneven depths, so the shrinking set of active trees is exercised
+    return RandomForestClassifier(n_estimators=25, max_depth=None, min_samples_leaf=3,
+                                  random_state=0).fit(X, y)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(1)
+    X = rng.normal(scale=1.5, size=(300, 6))
+    return np.vstack([X, X[:50]])  # with duplicates
+
+
+def test_matches_sklearn(forest, rows):
+    flat = flatten_forest(forest)
+    assert np.allclose(flat.predict_proba(rows), forest.predict_proba(rows), rtol=0, atol=1e-12)
+    assert np.allclose(flat.predict_proba(rows[:1]), forest.predict_proba(rows[:1]), rtol=0, atol=1e-12)
+
+
+def test_tree_depths(forest):
+    flat = flatten_forest(forest)
+    depths = [est.tree_.max_depth for est in forest.estimators_]
+    assert flat.tree_depth.tolist() == sorted(depths, reverse=True)
+    assert flat.depth == max(depths)
+    assert flat.active[0] == len(depths) and flat.active[-1] >= 1
+
+
+def test_save_load_round_trip(forest, rows, tmp_path):
+    path = str(tmp_path / "team_model_flat")
+    save_flat_forest(flatten_forest(forest), path)
+    loaded = load_flat_forest(path)
+    assert loaded.depth == flatten_forest(forest).depth
+    assert loaded.classes_.tolist() == forest.classes_.tolist()
+    assert np.allclose(loaded.predict_proba(rows), forest.predict_proba(rows), rtol=0, atol=1e-12)
+    # Scoring reads the mapped arrays directly: nothing is converted per process
+    for name in ("feature", "children", "threshold", "value", "roots"):
+        assert isinstance(getattr(loaded, name), np.memmap), name
+    assert loaded.feature.dtype == np.int64 and loaded.children.dtype == np.int64
+
+
+def test_loads_left_right_artifacts(forest, rows, tmp_path):
+    # Artifacts exported before `children` was stored
+    flat = flatten_forest(forest)
+    left, right = flat.children[0::2], flat.children[1::2]
+    roots = np.sort(flat.roots)
+    arrays = {"feature": flat.feature.astype(np.int32), "threshold": flat.threshold, "left": left,
+              "right": right, "value": flat.value, "roots": roots}
+    path = str(tmp_path / "legacy")
+    write_array_dir(path, arrays, {"format": "flat_forest", "depth": flat.depth,
+                                   "classes": forest.classes_.tolist(),
+                                   "arrays": {k: {"dtype": v.dtype.str, "shape": list(v.shape)}
+                                              for k, v in arrays.items()}})
+    loaded = load_flat_forest(path)
+    assert np.allclose(loaded.predict_proba(rows), forest.predict_proba(rows), rtol=0, atol=1e-12)
@@ -0,0 +1,68 @@
+# tests/test_incremental_stats.py
+# Folding new results into IncrementalStats must give the same team stats as
+# rebuilding the season from scratch, including when results arrive late
+
+import copy
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from scripts.build_team_stats import fold_new, incremental_window, parse_matches, parse_standings, rebuild
+from src.features import IncrementalStats
+
+SEASON = 2025
+
+
+def season_at(payload, now, delay):
+    """Matches payload as the API would return it at `now`: later or delayed results not in yet."""
+    payload = copy.deepcopy(payload)
+    for m, late in zip(payload["matches"], delay):
+        if pd.Timestamp(m["utcDate"]) + late > now:
+            m["status"] = "TIMED"
+            m["score"]["fullTime"] = {"home": None, "away": None}
+    return payload
+
+
+def pulled_window(matches, state):
+    """What pull_matches(**incremental_window(state)) returns: whole days from the watermark on."""
+    window = incremental_window(state)
+    if not window:
+        return matches
+    day = matches["utcDate"].dt.strftime("%Y-%m-%d")
+    return matches[(day >= window["date_from"]) & (day <= window["date_to"])]
+
+
+def test_fold_matches_full_rebuild():
+    names = synthetic.team_names(26)
+    now = synthetic.season_matches(names[:20], seed=1)
+    prev_payload = synthetic.season_matches(names[3:23], seed=2, start="2024-08-17")
+    prev, standings_prev = parse_matches(prev_payload), parse_standings(synthetic.standings_from_matches(prev_payload))
+    elc = parse_matches(synthetic.season_matches(names[:3] + names[23:], seed=3, start="2024-08-17"))
+
+    # A fifth of the results come in one to ten days late
+    rng = np.random.default_rng(7)
+    delay = pd.to_timedelta(np.where(rng.random(len(now["matches"])) < 0.2,
+                                     rng.integers(1, 11, len(now["matches"])), 0), unit="D")
+    kickoffs = sorted({pd.Timestamp(m["utcDate"]) for m in now["matches"]})
+
+    state, folded = None, 0
+    for t in kickoffs[::6] + [kickoffs[-1] + pd.Timedelta(days=30)]:
+        payload = season_at(now, t, delay)
+        standings, matches = parse_standings(synthetic.standings_from_matches(payload)), parse_matches(payload)
+        expected, fresh = rebuild(SEASON, standings, matches, standings_prev, prev, elc)
+        if state is None:
+            state = fresh
+            continue
+
+        # Persisted between runs
+        state = IncrementalStats.from_dict(json.loads(json.dumps(state.to_dict())))
+        before = sum(sum(split) for split in state.splits.values())
+        actual, state = fold_new(state, standings, pulled_window(matches, state))
+        folded += sum(sum(split) for split in state.splits.values()) - before
+        assert actual.to_csv() == expected.to_csv(), f"diverged at {t}"
+
+    assert folded > 0
+    assert state.watermark == max(kickoffs).isoformat()
+    assert not state.processed
@@ -0,0 +1,29 @@
+# tests/test_prediction_log.py
+# Reading back the JSONL prediction log, including a torn last line
+
+import time
+
+from src.prediction_log import PredictionLog, read_log
+
+
+def test_torn_lines_are_skipped_and_counted(tmp_path):
+    log = PredictionLog(directory=str(tmp_path), flush_interval=0.01)
+    for home, away in [("Arsenal", "Chelsea"), ("Leeds", "Burnley")]:
+        assert log.record(home, away, [0.5, 0.3, 0.2], source="test", competition="PL")
+    assert log.flush(timeout=5)
+
+    # A batch cut short mid-write (crash, or the writer still appending)
+    with open(log._path, "a") as f:
+        f.write('{"ts": 1700000000.0, "home_team": "Ars')
+
+    day = time.strftime("%Y-%m-%d", time.gmtime())
+    df = read_log(day, directory=str(tmp_path))
+    assert df["home_team"].tolist() == ["Arsenal", "Leeds"]
+    assert df[["home_win", "draw", "away_win"]].iloc[0].tolist() == [0.5, 0.3, 0.2]
+    assert df.attrs["unreadable"] == 1
+
+
+def test_empty_day(tmp_path):
+    df = read_log("2020-01-01", directory=str(tmp_path))
+    assert df.empty
+    assert df.attrs["unreadable"] == 0
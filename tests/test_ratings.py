@@ -0,0 +1,109 @@
+# tests/test_ratings.py
+# EloRatings.fold, which updates a level of matches at once, must equal one
+# `update` call per match in kickoff order
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from scripts.build_team_stats import parse_matches
+from src.ratings import EloRatings
+
+
+@pytest.fixture(scope="module")
+def matches():
+    """Two leagues over two seasons (with season regression), some teams moving between them."""
+    names = synthetic.team_names(24)
+    frames = []
+    for i, (comp, season, teams) in enumerate([
+        ("PL", 2024, names[:12]), ("ELC", 2024, names[12:24]),
+        ("PL", 2025, names[:10] + names[12:14]), ("ELC", 2025, names[10:12] + names[14:24]),
+    ]):
+        frame = parse_matches(synthetic.season_matches(teams, seed=i, start=f"{season}-08-16",
+                                                      played_fraction=0.8 if season == 2025 else 1.0))
+        frames.append(frame.assign(id=frame["id"] + 10_000 * i, competition=comp, season=season))
+    # Shuffled: fold must order by kickoff itself
+    return pd.concat(frames, ignore_index=True).sample(frac=1.0, random_state=0)
+
+
+def sequential(matches):
+    engine = EloRatings()
+    done = matches[matches["homeScore"].notna()].sort_values("utcDate", kind="stable")
+    for m in done.itertuples(index=False):
+        engine.update(m.homeTeam, m.awayTeam, m.homeScore, m.awayScore, m.utcDate,
+                      match_id=m.id, season=m.season)
+    return engine
+
+
+def assert_same(a, b, when=None):
+    left, right = a.snapshot(when).sort_index(), b.snapshot(when).sort_index()
+    assert left.index.tolist() == right.index.tolist()
+    np.testing.assert_allclose(left.to_numpy(), right.to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_fold_matches_sequential_updates(matches):
+    folded = EloRatings()
+    assert folded.fold(matches) == matches["homeScore"].notna().sum()
+    expected = sequential(matches)
+
+    assert_same(folded, expected)
+    for when in pd.date_range("2024-09-01", "2026-03-01", freq="45D", tz="UTC"):
+        assert_same(folded, expected, when)
+
+    probe = matches.sample(60, random_state=1)
+    teams = probe["homeTeam"].tolist() + probe["awayTeam"].tolist()
+    kickoffs = probe["utcDate"].tolist() * 2
+    np.testing.assert_allclose(folded.rating_at(teams, kickoffs), expected.rating_at(teams, kickoffs),
+                               rtol=0, atol=1e-9)
+
+
+def test_fold_in_batches(matches):
+    # Refreshes fold a season in pieces; the same match is never applied twice
+    by_date = matches.sort_values("utcDate", kind="stable")
+    engine = EloRatings()
+    for chunk in np.array_split(np.arange(len(by_date)), 7):
+        engine.fold(by_date.iloc[:chunk[-1] + 1])
+        engine = EloRatings.from_dict(json.loads(json.dumps(engine.to_dict())))
+    assert engine.fold(matches) == 0
+    assert_same(engine, sequential(matches))
+
+
+def test_late_results_are_replayed_in_kickoff_order(matches):
+    # Results for some matches only arrive after later kickoffs were folded
+    done = matches[matches["homeScore"].notna()].sort_values("utcDate", kind="stable")
+    late = done.sample(frac=0.15, random_state=2)
+    on_time = done.drop(late.index)
+
+    engine = EloRatings()
+    engine.fold(on_time.iloc[:len(on_time) // 2])
+    engine = EloRatings.from_dict(json.loads(json.dumps(engine.to_dict())))
+    engine.fold(on_time)
+    assert engine.fold(late) == len(late)
+    engine.update("Synthetic 0000 FC", "Synthetic 0001 FC", 2, 0, pd.Timestamp("2024-08-01", tz="UTC"),
+                  match_id=-1, season=2024)
+
+    expected = EloRatings()
+    expected.fold(pd.concat([done, pd.DataFrame([{
+        "id": -1, "utcDate": pd.Timestamp("2024-08-01", tz="UTC"), "homeTeam": "Synthetic 0000 FC",
+        "awayTeam": "Synthetic 0001 FC", "homeScore": 2, "awayScore": 0, "season": 2024}])]))
+
+    assert_same(engine, expected)
+    for when in pd.date_range("2024-09-01", "2026-03-01", freq="45D", tz="UTC"):
+        assert_same(engine, expected, when)
+    teams = done["homeTeam"].tolist()
+    np.testing.assert_allclose(engine.rating_at(teams, done["utcDate"]), expected.rating_at(teams, done["utcDate"]),
+                               rtol=0, atol=1e-9)
+
+
+def test_out_of_order_without_history_warns(matches):
+    done = matches[matches["homeScore"].notna()].sort_values("utcDate", kind="stable")
+    engine = EloRatings()
+    engine.fold(done.iloc[len(done) // 2:])
+    saved = engine.to_dict()
+    del saved["history"]
+    engine = EloRatings.from_dict(saved)
+    with pytest.warns(RuntimeWarning, match="full rebuild"):
+        engine.fold(done.iloc[:len(done) // 2])
@@ -0,0 +1,128 @@
+# tests/test_service.py
+# Request validation in the prediction service (bad input is a 400, never a
+# 500) and reloading predictors without blocking the event loop
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+import src.service as service_module
+from src.competitions import LRUCache
+from src.service import (
+    STALE_CHECK_INTERVAL, HttpError, PredictionService, Predictor, PredictorPool, read_request,
+)
+
+
+class NoModelPool:
+    """Pool stub: any request that gets as far as scoring is a test failure."""
+
+    cache = None
+
+    def peek(self, competition=None):
+        raise AssertionError("validation should have rejected the request")
+
+    score = peek
+
+
+def route(body):
+    service = PredictionService.__new__(PredictionService)
+    service.pool = NoModelPool()
+    return asyncio.run(service.route("POST", "/predict", json.dumps(body).encode()))
+
+
+@pytest.mark.parametrize("body", [
+    {"matches": [1]},
+    {"matches": "ARS-CHE"},
+    {"matches": [{"home": 1, "away": "CHE"}]},
+    {"matches": [{"home": "ARS"}]},
+    {"home": ["ARS"], "away": "CHE"},
+    {"home": "ARS", "away": "CHE", "competition": 5},
+    ["ARS", "CHE"],
+])
+def test_invalid_bodies_are_400(body):
+    with pytest.raises(HttpError) as exc:
+        route(body)
+    assert exc.value.status == 400
+
+
+def read(raw):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await read_request(reader)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_invalid_content_length_is_400(length):
+    with pytest.raises(HttpError) as exc:
+        read(b"POST /predict HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert exc.value.status == 400
+
+
+def test_valid_request_is_parsed():
+    method, target, headers, body = read(b"POST /predict HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")
+    assert (method, target, body) == ("POST", "/predict", b"{}")
+
+
+# -----------------------------
+# Reloading stale predictors
+# -----------------------------
+class FakePredictor:
+    def __init__(self, version, stale=False):
+        self.competition = "PL"
+        self.version = version
+        self.stale = stale
+
+    def is_stale(self):
+        return self.stale
+
+
+def test_stale_predictor_is_served_while_it_reloads():
+    gate, loads = threading.Event(), []
+
+    def load(code):
+        loads.append(code)
+        gate.wait(5)
+        return FakePredictor(len(loads) + 1)
+
+    pool = PredictorPool()
+    pool.cache = LRUCache(load, capacity=2)
+    pool.cache.entries["PL"] = old = FakePredictor(1)
+    service = PredictionService(pool)
+
+    async def run():
+        assert await service.predictor("PL") is old
+        old.stale = True
+        # The reload blocks in the executor; requests keep getting the old model
+        assert await service.predictor("PL") is old
+        assert await service.predictor("PL") is old
+        reload = service.reloading["PL"]
+        gate.set()
+        await reload
+        return await service.predictor("PL")
+
+    new = asyncio.run(run())
+    assert new.version == 2
+    assert loads == ["PL"]
+    assert not service.reloading
+
+
+def test_staleness_is_checked_at_most_every_interval(monkeypatch):
+    stats = []
+    monkeypatch.setattr(service_module, "artifact_signature", lambda paths: stats.append(1) or ("v2",))
+    clock = [100.0]
+    monkeypatch.setattr(service_module.time, "monotonic", lambda: clock[0])
+
+    predictor = Predictor.__new__(Predictor)
+    predictor.competition, predictor.signature = "PL", ("v1",)
+    predictor.checked, predictor.stale = clock[0], False
+    assert not predictor.is_stale()
+    assert stats == []
+    clock[0] += STALE_CHECK_INTERVAL
+    assert predictor.is_stale()
+    assert predictor.is_stale()
+    assert stats == [1]
@@ -0,0 +1,136 @@
+# tests/test_team_stats.py
+# The vectorized feature engine must write the same pl_team_stats.csv, byte
+# for byte, as the per-team loops it replaced (kept below as the reference)
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from scripts.build_team_stats import build_team_stats, parse_matches, parse_standings
+from src.store import export_csv
+from src.team_table import TeamTable
+
+SEASON = 2025
+
+
+# -----------------------------
+# Reference: the original per-team implementation
+# -----------------------------
+def result_value(home, away, hs, as_, team):
+    if hs is None or as_ is None:
+        return None
+    if team == home:
+        return 1 if hs > as_ else (0 if hs == as_ else -1)
+    return 1 if as_ > hs else (0 if as_ == hs else -1)
+
+
+def home_away(df, team):
+    home = df[(df["homeTeam"] == team) & df["homeScore"].notna()]
+    away = df[(df["awayTeam"] == team) & df["awayScore"].notna()]
+    return (sum(home["homeScore"] > home["awayScore"]), sum(home["homeScore"] == home["awayScore"]),
+            sum(home["homeScore"] < home["awayScore"]), sum(away["awayScore"] > away["homeScore"]),
+            sum(away["awayScore"] == away["homeScore"]), sum(away["awayScore"] < away["homeScore"]))
+
+
+def last5_weighted(df_matches, team, team_stats):
+    recent = df_matches[
+        ((df_matches["homeTeam"] == team) | (df_matches["awayTeam"] == team)) &
+        df_matches["homeScore"].notna() & df_matches["awayScore"].notna()
+    ].sort_values("utcDate").tail(5)
+
+    form_vec, total_form, total_weighted = [], 0, 0
+    for _, m in recent.iterrows():
+        r = result_value(m.homeTeam, m.awayTeam, m.homeScore, m.awayScore, team)
+        if r is None:
+            continue
+        opponent = m.awayTeam if m.homeTeam == team else m.homeTeam
+        opp_stats = team_stats.row(opponent)
+        opp_rating = 0.5 * opp_stats["points"] + 0.5 * opp_stats["goal_diff"]
+        if m["homeTeam"] == opponent:
+            opp_rating += 5
+        form_vec.append(r)
+        total_form += r
+        total_weighted += r * opp_rating
+    return form_vec, total_form, total_weighted
+
+
+def reference_team_stats(standings_now, matches_now, standings_prev, matches_prev, elc_prev):
+    table_now = TeamTable.from_frame(standings_now)
+    teams_prev = set(standings_prev["team"])
+    rows = []
+    for team in sorted(set(standings_now["team"])):
+        hw, hd, hl, aw, ad, al = home_away(matches_now, team)
+        form_vec, form_total, weighted_form = last5_weighted(matches_now, team, table_now)
+        src = matches_prev if team in teams_prev else elc_prev
+        phw, phd, phl, paw, pad, pal = home_away(src, team)
+        rows.append({
+            "team": team, **table_now.row(team),
+            "home_wins": hw, "home_draws": hd, "home_losses": hl,
+            "away_wins": aw, "away_draws": ad, "away_losses": al,
+            "weighted_home_wins": hw + 0.5*phw, "weighted_home_draws": hd + 0.5*phd,
+            "weighted_home_losses": hl + 0.5*phl, "weighted_away_wins": aw + 0.5*paw,
+            "weighted_away_draws": ad + 0.5*pad, "weighted_away_losses": al + 0.5*pal,
+            "form_last_5": str(form_vec), "form_total": form_total,
+            "strength_weighted_form": weighted_form,
+        })
+    return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Synthetic seasons
+# -----------------------------
+@pytest.fixture(params=[0.1, 0.6, 1.0], ids=lambda f: f"played{f}")
+def seasons(request):
+    """PL now/previous with three promoted teams, whose previous season is in ELC."""
+    names = synthetic.team_names(45)
+    pl_now, pl_prev, elc_prev = names[:20], names[3:23], names[:3] + names[23:44]
+    now = synthetic.season_matches(pl_now, seed=1, played_fraction=request.param)
+    prev = synthetic.season_matches(pl_prev, seed=2, start="2024-08-17")
+    elc = synthetic.season_matches(elc_prev, seed=3, start="2024-08-17")
+
+    matches_now = parse_matches(now)
+    # One team whose matches are all still to be played
+    idle = (matches_now["homeTeam"] == pl_now[-1]) | (matches_now["awayTeam"] == pl_now[-1])
+    matches_now.loc[idle, ["homeScore", "awayScore"]] = None
+    for m in now["matches"]:
+        if pl_now[-1] in (m["homeTeam"]["name"], m["awayTeam"]["name"]):
+            m["score"]["fullTime"] = {"home": None, "away": None}
+    return (parse_standings(synthetic.standings_from_matches(now)), matches_now,
+            parse_standings(synthetic.standings_from_matches(prev)), parse_matches(prev), parse_matches(elc))
+
+
+def _csv(frame, tmp_path, name):
+    path = tmp_path / name
+    export_csv(frame, path)
+    return path.read_bytes()
+
+
+def test_csv_identical_to_per_team_loops(seasons, tmp_path):
+    expected = _csv(reference_team_stats(*seasons), tmp_path, "reference.csv")
+    actual = _csv(build_team_stats(*seasons, SEASON), tmp_path, "built.csv")
+    assert actual == expected
+
+
+def test_missing_lower_division(seasons, tmp_path):
+    # Promoted teams simply get no previous-season splits when ELC wasn't pulled
+    standings_now, matches_now, standings_prev, matches_prev, elc_prev = seasons
+    empty = elc_prev.iloc[:0]
+    expected = _csv(reference_team_stats(standings_now, matches_now, standings_prev, matches_prev, empty),
+                    tmp_path, "reference.csv")
+    actual = _csv(build_team_stats(standings_now, matches_now, standings_prev, matches_prev, None, SEASON),
+                  tmp_path, "built.csv")
+    assert actual == expected
+    assert not np.isnan(build_team_stats(*seasons, SEASON)["strength_weighted_form"]).any()
+
+
+def test_season_not_started(seasons, tmp_path):
+    # With no finished match at all, the loops left strength_weighted_form as
+    # int 0; the engine writes the float the bundle schema declares
+    standings_now, matches_now, *rest = seasons
+    matches_now = matches_now.assign(homeScore=None, awayScore=None)
+    standings_now = standings_now.assign(**{c: 0 for c in standings_now.columns if c != "team"})
+    reference = reference_team_stats(standings_now, matches_now, *rest)
+    reference["strength_weighted_form"] = reference["strength_weighted_form"].astype(float)
+    expected = _csv(reference, tmp_path, "reference.csv")
+    assert _csv(build_team_stats(standings_now, matches_now, *rest, SEASON), tmp_path, "built.csv") == expected